@@ -35,7 +35,7 @@ myPath = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, myPath + '/../')
 
 from solvers.sspe import min_expected_cost
-from solvers.sspp import force_short_paths_from
+from solvers.sspp import force_short_paths_from, force_short_paths
 from structures import generator
 from solvers.reachability import reach
 from benchmarks.timer import Timer
@@ -68,8 +68,7 @@ def worst_case_benchmark(number_of_states=50, number_of_actions=10, dimensions=3
             # SSPP
             t = Timer(verbose=False)
             with t:
-                for s in range(mdp.number_of_states):
-                    force_short_paths_from(mdp, mdp.number_of_states - 1, T, 5, 0)
+                force_short_paths(mdp, T, 5, 0)
             time_taken = t.interval
             Y2[alpha][n] = time_taken
             print('{:^19f}'.format(time_taken))
@@ -149,7 +148,7 @@ def worst_case_benchmark_sspp(number_of_states=51, number_of_actions=11, l_max=2
             # expected cost to T
             t = Timer(verbose=False)
             with t:
-                force_short_paths_from(mdp, mdp.number_of_states - 1, T, l, 0)
+                force_short_paths_from(mdp, mdp.number_of_states - 1, T, l, 0, method='dp')
             time_taken = t.interval
             Y[l][n] = time_taken
             print('{:^19f}'.format(time_taken))
@@ -0,0 +1,151 @@
+"""
+This module is used to save a MDP into a binary file and to load it back, without any parsing : the file stores the
+arrays of the MDP as a CompactMDP (@see structures.mdp.CompactMDP) and load memory-maps them, so that loading a MDP
+only costs a few milliseconds whatever its size, and the processes that load the same file share its pages.
+The layout of a file is the following (little-endian, each section being padded to a multiple of 8 bytes) :
+
+    header                  magic (6 bytes) | version (uint16) | number of states (n), choices (c), transitions (t),
+                            actions (a), state names (n_s), action names (n_a) (uint64) | length in bytes of the
+                            state names (b_s) and of the action names (b_a) (uint64)
+    choice_offsets          int64[n + 1]
+    transition_offsets      int64[c + 1]
+    probabilities           float64[t]
+    weights                 int64[a]
+    state_name_offsets      int64[n_s + 1]      (offsets of the names in the state names)
+    action_name_offsets     int64[n_a + 1]      (offsets of the names in the action names)
+    choice_actions          int32[c]
+    successors              int32[t]
+    state_names             bytes[b_s]          (utf-8 encoded names, concatenated)
+    action_names            bytes[b_a]
+
+"""
+import mmap
+import struct
+from typing import List
+
+import numpy as np
+
+from structures.mdp import MDP, CompactMDP
+
+EXTENSION = '.smdp'
+"""Extension of the binary MDP files.
+"""
+
+_MAGIC = b'SSPMDP'
+_VERSION = 1
+_HEADER = struct.Struct('<6sH8Q')
+
+
+def save(mdp: MDP, file_name: str) -> None:
+    """
+    Save a MDP into a binary file.
+
+    :param mdp: a MDP.
+    :param file_name: the name of the binary file, without extension : the MDP is saved into file_name + EXTENSION,
+                      so that it can be loaded back with load(file_name).
+    """
+    compact = CompactMDP.from_mdp(mdp)
+    state_name_offsets, state_names = _encode(compact._states_name)
+    action_name_offsets, action_names = _encode(compact._actions_name)
+    sections = [(compact.choice_offsets, '<i8'), (compact.transition_offsets, '<i8'),
+                (compact.probabilities, '<f8'), (compact._w, '<i8'),
+                (state_name_offsets, '<i8'), (action_name_offsets, '<i8'),
+                (compact.choice_actions, '<i4'), (compact.successors, '<i4'),
+                (state_names, 'u1'), (action_names, 'u1')]
+    with open(file_name + EXTENSION, 'wb') as binary_file:
+        binary_file.write(_HEADER.pack(_MAGIC, _VERSION, compact.number_of_states, compact.number_of_choices,
+                                       len(compact.successors), compact.number_of_actions,
+                                       len(state_name_offsets) - 1, len(action_name_offsets) - 1,
+                                       len(state_names), len(action_names)))
+        for (array, dtype) in sections:
+            array = np.ascontiguousarray(array, dtype=dtype)
+            binary_file.write(array.tobytes())
+            binary_file.write(bytes(-array.nbytes % 8))
+
+
+def load(file_name: str, memory_map=True) -> CompactMDP:
+    """
+    Load a MDP from a binary file (@see save).
+    The arrays of the CompactMDP returned are read only views of the file : they are memory-mapped (unless memory_map is
+    False), so that they are only read from the disk when they are accessed, and the names of the states and of the
+    actions are only decoded when they are accessed.
+
+    :param file_name: the name of the binary file, with or without extension : EXTENSION is appended if the name does
+                      not end with it (@see save).
+    :param memory_map: (optional) set this parameter to False to read the whole file in memory instead of
+                       memory-mapping it.
+    :return: the MDP loaded from the binary file, as a CompactMDP.
+    """
+    if not file_name.endswith(EXTENSION):
+        file_name += EXTENSION
+    with open(file_name, 'rb') as binary_file:
+        if memory_map:
+            buffer = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = binary_file.read()
+    if len(buffer) < _HEADER.size:
+        raise ValueError('%s is not a binary MDP file.' % file_name)
+    magic, version, n, c, t, a, n_s, n_a, b_s, b_a = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC:
+        raise ValueError('%s is not a binary MDP file.' % file_name)
+    if version != _VERSION:
+        raise ValueError('The version %d of the binary MDP file %s is not supported.' % (version, file_name))
+    sections = [(n + 1, '<i8'), (c + 1, '<i8'), (t, '<f8'), (a, '<i8'), (n_s + 1, '<i8'), (n_a + 1, '<i8'),
+                (c, '<i4'), (t, '<i4'), (b_s, 'u1'), (b_a, 'u1')]
+    offset = _HEADER.size
+    arrays = []
+    for (count, dtype) in sections:
+        nbytes = count * np.dtype(dtype).itemsize
+        if offset + nbytes > len(buffer):
+            raise ValueError('The binary MDP file %s is truncated.' % file_name)
+        arrays.append(np.frombuffer(buffer, dtype=dtype, count=count, offset=offset))
+        offset += nbytes + (-nbytes % 8)
+    choice_offsets, transition_offsets, probabilities, w, state_name_offsets, action_name_offsets, \
+        choice_actions, successors, state_names, action_names = arrays
+    return CompactMDP(NameTable(state_name_offsets, state_names), NameTable(action_name_offsets, action_names),
+                      w.tolist(), choice_offsets, choice_actions, transition_offsets, successors, probabilities)
+
+
+class NameTable:
+    """ Read only list of names stored as concatenated utf-8 encoded names, e.g., in a memory-mapped binary MDP file.
+    Each name is only decoded when it is accessed.
+
+    Initialisation parameters :
+        :param offsets: array of length (number of names + 1) such that the i th name is names[offsets[i]:offsets[i + 1]].
+        :param names: array of bytes of the concatenated names.
+    """
+
+    def __init__(self, offsets: np.ndarray, names: np.ndarray):
+        self._offsets = offsets
+        self._names = names
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('name index out of range')
+        return self._names[self._offsets[index]:self._offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        names = self._names.tobytes()
+        offsets = self._offsets.tolist()
+        return (names[lo:hi].decode('utf-8') for (lo, hi) in zip(offsets, offsets[1:]))
+
+    def __add__(self, other: List[str]) -> List[str]:
+        return list(self) + list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _encode(names: List[str]):
+    # offsets and concatenation of the utf-8 encoded names
+    encoded = [name.encode('utf-8') for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
@@ -0,0 +1,132 @@
+"""
+This module contains the MDP builder shared by the streaming importers (@see yaml_parser and json_lines).
+"""
+from array import array
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from structures.mdp import MDP
+
+
+class MDPBuilder:
+    """ Columns of the transitions of a MDP being imported, filled while the file is read.
+    The states and the actions are referred to by their names, that can be used before being declared : each name is
+    identified by the index of its first occurrence (as a declaration or as a reference) until the MDP is built, where
+    the names are resolved at once. The transitions are stored as typed arrays, so that the memory used by the builder
+    stays close to the size of the final MDP.
+    """
+
+    def __init__(self):
+        self.states: List[str] = []
+        self.actions: List[str] = []
+        self.w: List[int] = []
+        self._state_ids: Dict[str, int] = {}
+        self._action_ids: Dict[str, int] = {}
+        # index of the state (resp. action) declared with the name of each identifier, -1 if it is not declared
+        self._state_of_id = array('q')
+        self._action_of_id = array('q')
+        self._sources = array('q')
+        self._alphas = array('q')
+        self._successors = array('q')
+        self._probabilities = array('d')
+
+    @staticmethod
+    def _id(name: str, ids: Dict[str, int], of_id: array) -> int:
+        i = ids.get(name)
+        if i is None:
+            i = ids[name] = len(of_id)
+            of_id.append(-1)
+        return i
+
+    def state_id(self, name: str) -> int:
+        """
+        Get the identifier of the state name in parameter, declared or not.
+
+        :param name: the name of a state.
+        :return: the identifier of this name.
+        """
+        return self._id(name, self._state_ids, self._state_of_id)
+
+    def action_id(self, name: str) -> int:
+        """
+        Get the identifier of the action name in parameter, declared or not.
+
+        :param name: the name of an action.
+        :return: the identifier of this name.
+        """
+        return self._id(name, self._action_ids, self._action_of_id)
+
+    def add_state(self, name: str = None) -> int:
+        """
+        Declare a new state, whose index is the number of states already declared.
+
+        :param name: (optional) the name of the state. If it is not known yet, it has to be given with name_state.
+        :return: the index of the new state.
+        """
+        s = len(self.states)
+        self.states.append(None)
+        if name is not None:
+            self.name_state(s, name)
+        return s
+
+    def name_state(self, s: int, name: str) -> None:
+        """
+        Give its name to a declared state.
+
+        :param s: the index of a declared state.
+        :param name: the name of the state.
+        """
+        self.states[s] = name
+        self._state_of_id[self.state_id(name)] = s
+
+    def add_action(self, name: str, weight: int) -> int:
+        """
+        Declare a new action, whose index is the number of actions already declared.
+
+        :param name: the name of the action.
+        :param weight: the weight of the action.
+        :return: the index of the new action.
+        """
+        alpha = len(self.actions)
+        self._action_of_id[self.action_id(name)] = alpha
+        self.actions.append(name)
+        self.w.append(weight)
+        return alpha
+
+    def add_transitions(self, s: int, alpha_id: int, transitions: List[Tuple[int, float]]) -> None:
+        """
+        Add the α-successors of a declared state.
+
+        :param s: the index of a declared state.
+        :param alpha_id: the identifier of the action α (@see action_id).
+        :param transitions: a list of tuples (succ_id, pr) where succ_id is the identifier of an α-successor s' of s (@see
+                            state_id) and pr = ∆(s, α, s').
+        """
+        self._sources.extend([s] * len(transitions))
+        self._alphas.extend([alpha_id] * len(transitions))
+        for (succ_id, pr) in transitions:
+            self._successors.append(succ_id)
+            self._probabilities.append(pr)
+
+    def build(self, validation=True) -> MDP:
+        """
+        Resolve the names and build the MDP at once (@see MDP.from_arrays).
+
+        :param validation: (optional) @see MDP.
+        :return: the MDP built.
+        """
+        unnamed = [s for (s, name) in enumerate(self.states) if name is None]
+        if unnamed:
+            raise ValueError('The states %s have no name.' % ', '.join(map(str, unnamed)))
+        state_of_id = np.frombuffer(self._state_of_id, dtype=np.int64)
+        action_of_id = np.frombuffer(self._action_of_id, dtype=np.int64)
+        for (kind, ids, of_id) in (('state', self._state_ids, state_of_id),
+                                   ('action', self._action_ids, action_of_id)):
+            undeclared = [name for (name, i) in ids.items() if of_id[i] == -1]
+            if undeclared:
+                raise ValueError('No %s labeled %s in the MDP.' % (kind, ', '.join(map(str, undeclared))))
+        return MDP.from_arrays(self.states, self.actions, self.w, np.frombuffer(self._sources, dtype=np.int64),
+                               action_of_id[np.frombuffer(self._alphas, dtype=np.int64)],
+                               state_of_id[np.frombuffer(self._successors, dtype=np.int64)],
+                               np.frombuffer(self._probabilities, dtype=np.float64), validation=validation)
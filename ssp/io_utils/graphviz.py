@@ -1,29 +1,171 @@
-from typing import List
+"""
+This module is used to plot MDPs with Graphviz.
+As the plot of a large MDP (e.g., an unfolded MDP) can not be rendered, export_mdp can only plot a part of the MDP
+(following its mode parameter) and never plots more than max_nodes nodes (states and actions) : the states are added
+in breadth-first order from the chosen states until this budget is reached, and the plot is then labeled as truncated.
+"""
+from collections import deque
+from typing import List, Iterable, Tuple, Callable, Dict
 from graphviz import Digraph
 from structures.mdp import MDP
 
+MODES = ('full', 'strategy', 'neighborhood', 'collapsed')
+"""Modes of export_mdp :
+    - 'full' : all the states and all the actions of the MDP.
+    - 'strategy' : the Markov chain induced by the strategy, i.e., the states reachable from the chosen states (all the
+      states by default) through the actions of the strategy, and only these actions.
+    - 'neighborhood' : the states at distance at most k from the chosen states in the underlying graph of the MDP (in
+      both directions), with all their actions.
+    - 'collapsed' : for an unfolded MDP (@see structures.mdp.UnfoldedMDP and LazyUnfoldedMDP), the copies (s, v) of each
+      state s of the initial MDP are merged into s. The actions chosen by the strategy in at least one copy are in red.
+"""
 
-def export_mdp(mdp: MDP, mdp_name: str, strategy: List[int]=[]) -> None:
-    states = range(mdp.number_of_states)
+MAX_NODES = 500
+"""Default maximum number of nodes of a plot.
+"""
+
+
+def export_mdp(mdp: MDP, mdp_name: str, strategy: List[int]=[], mode: str='full', states: Iterable[int]=None,
+               k: int=1, max_nodes: int=MAX_NODES, view=True) -> None:
+    """
+    Plot a MDP with Graphviz into the file mdp_name.gv (and its rendering mdp_name.gv.pdf), the actions chosen by the
+    strategy being in red.
+
+    :param mdp: a MDP.
+    :param mdp_name: the name of the plot and of its files.
+    :param strategy: (optional) a list such that strategy[s] is the action chosen in the state s.
+    :param mode: (optional) the part of the MDP to plot, in MODES ('full' by default).
+    :param states: (optional) the states from which the plotted states are chosen : the initial states for the
+                   'strategy' mode (all the states by default) and the centers for the 'neighborhood' mode (required).
+                   Ignored by the other modes.
+    :param k: (optional) the radius of the neighborhood (only used if mode is 'neighborhood').
+    :param max_nodes: (optional) the maximum number of nodes (states and actions) of the plot.
+    :param view: (optional) set this parameter to False to only render the plot into its file, without opening it in a
+                 viewer (e.g., in a script or on a server).
+    """
+    if mode not in MODES:
+        raise ValueError("Unknown mode '%s' (available modes : %s)." % (mode, ', '.join(MODES)))
+    if mode == 'strategy' and not strategy:
+        raise ValueError("The 'strategy' mode requires a strategy.")
+    if mode == 'neighborhood' and states is None:
+        raise ValueError("The 'neighborhood' mode requires the states whose neighborhood is plotted.")
+
+    if mode == 'collapsed':
+        number_of_states, state_name, choices_of = _collapsed(mdp, strategy)
+    else:
+        number_of_states, state_name = mdp.number_of_states, mdp.state_name
+
+        def choices_of(s: int) -> List[Tuple[int, List[Tuple[int, str]], bool]]:
+            chosen = strategy[s] if strategy else None
+            return [(alpha, [(succ, str(round(pr, 4))) for (succ, pr) in succ_list], alpha == chosen)
+                    for (alpha, succ_list) in mdp.alpha_successors(s) if mode != 'strategy' or alpha == chosen]
+
+    # plotted states, in breadth-first order from the chosen states, within the nodes budget
+    seeds = list(states) if states is not None and mode in ('strategy', 'neighborhood') else range(number_of_states)
+    depth = {s: 0 for s in seeds}
+    queue = deque(depth)
+    plotted: Dict[int, List[Tuple[int, List[Tuple[int, str]], bool]]] = {}
+    nodes = 0
+    truncated = 0
+    while queue:
+        s = queue.popleft()
+        choices = choices_of(s)
+        if nodes + 1 + len(choices) > max_nodes:
+            truncated = len(depth) - len(plotted)
+            break
+        nodes += 1 + len(choices)
+        plotted[s] = choices
+        if mode in ('strategy', 'neighborhood') and (mode == 'strategy' or depth[s] < k):
+            neighbours = [succ for (_, succ_list, _) in choices for (succ, _) in succ_list]
+            if mode == 'neighborhood':
+                neighbours += sorted(mdp.pred(s))
+            for succ in neighbours:
+                if succ not in depth:
+                    depth[succ] = depth[s] + 1
+                    queue.append(succ)
 
     g = Digraph(mdp_name, filename=mdp_name + '.gv')
+    if truncated:
+        g.attr(label='truncated : %d states not plotted (max_nodes = %d)' % (truncated, max_nodes))
 
     g.attr('node', shape='circle')
-    for s in states:
-        g.node('s%d' % s, label=mdp.state_name(s))
+    for s in plotted:
+        g.node('s%d' % s, label=str(state_name(s)))
 
     g.attr('node', shape='point')
-    for s in states:
-        for (alpha, succ_list) in mdp.alpha_successors(s):
-            if strategy and strategy[s] == alpha:
-                color = 'red'
-            else:
-                color = 'black'
+    for (s, choices) in plotted.items():
+        for (alpha, successors, chosen) in choices:
+            color = 'red' if chosen else 'black'
             g.node('s%d->a%d' % (s, alpha),
                    xlabel=' ' + mdp.act_name(alpha) + ' | ' + str(mdp.w(alpha)) + ' ', fontsize='8',
                    fontcolor=color, color=color)
             g.edge('s%d' % s, 's%d->a%d' % (s, alpha))
+            for (succ, label) in successors:
+                if succ in plotted:
+                    g.edge('s%d->a%d' % (s, alpha), 's%d' % succ, label=label, fontsize='8')
+
+    if view:
+        g.view()
+    else:
+        g.render()
+
+
+def parse_options(argv: List[str]) -> Tuple[List[str], dict]:
+    """
+    Extract the plot options of the command line of a solver from its arguments :
+        --mode <mode>: the mode of the plot, in MODES.
+        --around <s>: a state from which the plotted states are chosen (can be repeated, @see export_mdp).
+        --k <k>: the radius of the neighborhood (only used by the 'neighborhood' mode).
+        --max-nodes <n>: the maximum number of nodes of the plot.
+        --no-view: only render the plot into its file, without opening it in a viewer.
+
+    :param argv: the arguments of the command line.
+    :return: a tuple (arguments, options) where arguments are the other arguments of the command line and options the
+             keyword arguments of export_mdp. The states of the option 'states' are given by their names.
+    """
+    arguments, options = [], {}
+    i = 0
+    while i < len(argv):
+        if argv[i] in ('--mode', '--around', '--k', '--max-nodes') and i + 1 < len(argv):
+            if argv[i] == '--mode':
+                options['mode'] = argv[i + 1]
+            elif argv[i] == '--around':
+                options.setdefault('states', []).append(argv[i + 1])
+            elif argv[i] == '--k':
+                options['k'] = int(argv[i + 1])
+            else:
+                options['max_nodes'] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--no-view':
+            options['view'] = False
+            i += 1
+        else:
+            arguments.append(argv[i])
+            i += 1
+    return arguments, options
+
+
+def _collapsed(mdp: MDP, strategy: List[int]) -> Tuple[int, Callable[[int], str],
+                                                       Callable[[int], List[Tuple[int, List[Tuple[int, str]], bool]]]]:
+    # the graph of an unfolded MDP whose copies (s, v) are merged into s (⊥ being the last state), where an edge
+    # (s, α) → s' is labeled with the probabilities ∆((s, v), α, (s', v')) of its copies
+    if not hasattr(mdp, 'convert'):
+        raise ValueError("The 'collapsed' mode requires an unfolded MDP.")
+    collapsed: Dict[int, Dict[int, Tuple[Dict[int, set], bool]]] = {}
+    for s in range(mdp.number_of_states):
+        actions = collapsed.setdefault(mdp.convert(s)[0], {})
+        for (alpha, succ_list) in mdp.alpha_successors(s):
+            successors, chosen = actions.get(alpha, ({}, False))
             for (succ, pr) in succ_list:
-                g.edge('s%d->a%d' % (s, alpha), 's%d' % succ, label=str(round(pr, 4)), fontsize='8')
+                successors.setdefault(mdp.convert(succ)[0], set()).add(round(pr, 4))
+            actions[alpha] = (successors, chosen or bool(strategy) and strategy[s] == alpha)
+    # the collapsed states are indexed by their index in the initial MDP, ⊥ being the last one
+    order = sorted(c for c in collapsed if c != -1) + ([-1] if -1 in collapsed else [])
+    index = {c: i for (i, c) in enumerate(order)}
+
+    def choices_of(i: int) -> List[Tuple[int, List[Tuple[int, str]], bool]]:
+        return [(alpha, [(index[succ], ', '.join(map(str, sorted(prs)))) for (succ, prs) in successors.items()],
+                 chosen)
+                for (alpha, (successors, chosen)) in collapsed[order[i]].items()]
 
-    g.view()
+    return len(order), lambda i: mdp._states_name[order[i]] if order[i] != -1 else '⊥', choices_of
@@ -0,0 +1,88 @@
+"""
+This module is used to import and export MDPs as line-delimited JSON files, i.e., one JSON object per line. It is the
+equivalent of the yaml syntax of the yaml_parser module, that can be written and read line by line :
+
+    {"action": {"name": <name of an action α>, "weight": <w(α)>}}
+    ...
+    {"state": {"name": <name of a state s>, "enabled actions": [
+        {"name": <name of an enabled action α of s>, "transitions": [
+            {"target": <name of an α-successor of s : s'>, "probability": <∆(s, α, s')>}, ...]}, ...]}}
+    ...
+
+where each object is on a single line. The actions and the states can be given in any order, and a probability can
+also be a rational number encoded as string (e.g., "1/3").
+"""
+import gzip
+import json
+import sys
+from typing import TextIO
+
+from structures.mdp import MDP
+from io_utils.builder import MDPBuilder
+from io_utils.yaml_parser import str_to_float
+
+
+def import_from_jsonl(stream) -> MDP:
+    """
+    Import a line-delimited JSON file (as stream) into a MDP.
+    Only one line is decoded at a time, the transitions being stored as columns until the MDP is built at once (@see
+    io_utils.builder.MDPBuilder).
+
+    :param stream: line-delimited JSON file stream.
+    :return: the MDP imported from the file.
+    """
+    builder = MDPBuilder()
+    for (i, line) in enumerate(stream):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if 'state' in item:
+            state = item['state']
+            s = builder.add_state(str(state['name']))
+            for enabled_action in state.get('enabled actions', []):
+                builder.add_transitions(s, builder.action_id(str(enabled_action['name'])),
+                                        [(builder.state_id(str(transition['target'])),
+                                          str_to_float(str(transition['probability'])))
+                                         for transition in enabled_action['transitions']])
+        elif 'action' in item:
+            builder.add_action(str(item['action']['name']), int(item['action']['weight']))
+        else:
+            raise ValueError('The line %d is neither a state nor an action.' % (i + 1))
+    return builder.build()
+
+
+def export_to_jsonl(mdp: MDP, file_name: str, compress=False) -> None:
+    """
+    Serialise a MDP instance into a line-delimited JSON file (@see write_jsonl).
+
+    :param mdp: a MDP
+    :param file_name: the name of the file (without extension). If it is empty, the lines are printed in the console.
+    :param compress: (optional) set this parameter to True to compress the file with gzip (.jsonl.gz).
+    """
+    if not file_name:
+        write_jsonl(mdp, sys.stdout)
+    elif compress:
+        with gzip.open(file_name + '.jsonl.gz', 'wt', encoding='utf-8') as jsonl_file:
+            write_jsonl(mdp, jsonl_file)
+    else:
+        with open(file_name + '.jsonl', 'w', encoding='utf-8') as jsonl_file:
+            write_jsonl(mdp, jsonl_file)
+
+
+def write_jsonl(mdp: MDP, stream: TextIO) -> None:
+    """
+    Write a MDP as line-delimited JSON into a text stream, the actions first, then the states, one line at a time.
+
+    :param mdp: a MDP
+    :param stream: a text stream, e.g., a file opened in writing mode.
+    """
+    for alpha in range(mdp.number_of_actions):
+        stream.write(json.dumps({'action': {'name': mdp.act_name(alpha), 'weight': mdp.w(alpha)}},
+                                ensure_ascii=False) + '\n')
+    for s in range(mdp.number_of_states):
+        stream.write(json.dumps({'state': {
+            'name': mdp.state_name(s),
+            'enabled actions': [{'name': mdp.act_name(alpha),
+                                 'transitions': [{'target': mdp.state_name(succ), 'probability': pr}
+                                                 for (succ, pr) in succ_list]}
+                                for (alpha, succ_list) in mdp.alpha_successors(s)]}}, ensure_ascii=False) + '\n')
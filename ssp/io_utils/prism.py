@@ -0,0 +1,211 @@
+"""
+This module is used to import and export MDPs in the explicit formats of the PRISM model checker :
+
+    - transitions (.tra) : a header line '<number of states> <number of choices> <number of transitions>', then one
+      line per transition '<s> <i> <s'> <∆(s, α, s')> [<α>]', where i is the index of the choice (s, α) among the
+      choices of s and the action label α is optional.
+    - states (.sta) : a header line '(<variable>,...)', then one line per state '<s>:(<value>,...)'. The name of a
+      state is its valuation, e.g., '(1,2)'.
+    - labels (.lab) : a header line '0="<label>" 1="<label>" ...', then one line per labelled state '<s>: <label index>
+      ...'.
+    - transition rewards (.trew) : a header line '<number of states> <number of choices> <number of rewards>', then one
+      line per reward, either '<s> <i> <r>' (reward of the choice) or '<s> <i> <s'> <r>' (reward of the transition).
+
+The reward of a choice (s, α) (its expected reward, for transition rewards) is the weight of its action in the MDP, so it
+must be a positive integer. As the weights are given by action in the MDP, the action of a choice is labeled with the
+action label of the choice (or 'a<i>' if it has none), followed by '|<weight>' if this label is used with several
+rewards, and by '#<i>' if several choices of a same state would get the same action.
+The files are read and written line by line, and the MDP is built at once from the columns of the transitions (@see
+MDP.from_arrays).
+"""
+import re
+from array import array
+from typing import Dict, List, TextIO
+
+import numpy as np
+
+from structures.mdp import MDP
+
+# a state name that is a valuation of PRISM variables
+_VALUATION = re.compile(r'\([^\s()]*\)')
+
+
+def import_from_prism(tra: TextIO, sta: TextIO = None, rew: TextIO = None) -> MDP:
+    """
+    Import a MDP from PRISM explicit files (as streams).
+
+    :param tra: the transitions (.tra) file stream.
+    :param sta: (optional) the states (.sta) file stream. If it is not provided, the states' names are generated.
+    :param rew: (optional) the transition rewards (.trew) file stream. If it is not provided, each action has weight 1.
+    :return: the MDP imported from these files.
+    """
+    number_of_states = _header(tra, 'transitions')[0]
+    sources, choices, successors = array('q'), array('q'), array('q')
+    probabilities = array('d')
+    label_ids: Dict[str, int] = {}
+    labels = array('q')
+    for (i, line) in enumerate(tra):
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) not in (4, 5):
+            raise ValueError('The line %d of the transitions file is not a transition.' % (i + 2))
+        sources.append(int(fields[0]))
+        choices.append(int(fields[1]))
+        successors.append(int(fields[2]))
+        probabilities.append(float(fields[3]))
+        labels.append(label_ids.setdefault(fields[4], len(label_ids)) if len(fields) == 5 else -1)
+    sources = np.frombuffer(sources, dtype=np.int64)
+    choices = np.frombuffer(choices, dtype=np.int64)
+    successors = np.frombuffer(successors, dtype=np.int64)
+    probabilities = np.frombuffer(probabilities, dtype=np.float64)
+    labels = np.frombuffer(labels, dtype=np.int64)
+
+    # the choices (s, i), and the choice of each transition
+    width = int(choices.max()) + 1 if len(choices) else 1
+    keys, first, transition_choices = np.unique(sources * width + choices, return_index=True, return_inverse=True)
+    transition_choices = transition_choices.reshape(-1)
+    choice_states, choice_indexes, choice_labels = keys // width, keys % width, labels[first]
+
+    # the weight of each choice
+    if rew is None:
+        weights = np.ones(len(keys))
+    else:
+        _header(rew, 'rewards')
+        choice_rewards, transition_rewards = {}, {}
+        for line in rew:
+            fields = line.split()
+            if len(fields) == 3:
+                choice_rewards[int(fields[0]) * width + int(fields[1])] = float(fields[2])
+            elif len(fields) == 4:
+                transition_rewards[(int(fields[0]) * width + int(fields[1]), int(fields[2]))] = float(fields[3])
+        weights = np.array([choice_rewards.get(key, 0.) for key in keys.tolist()])
+        if transition_rewards:
+            rewards = np.array([transition_rewards.get((key, succ), 0.) for (key, succ) in
+                                zip((sources * width + choices).tolist(), successors.tolist())])
+            weights += np.bincount(transition_choices, weights=probabilities * rewards, minlength=len(keys))
+    wrong = np.flatnonzero((np.abs(weights - np.round(weights)) > 1e-9) | (np.round(weights) <= 0))
+    if len(wrong):
+        raise ValueError('The rewards of the following choices (s, i, reward) are not positive integers, they can not '
+                         'be the weights of their actions: %s.'
+                         % str([(s, i, r) for (s, i, r) in zip(choice_states[wrong].tolist(),
+                                                               choice_indexes[wrong].tolist(),
+                                                               weights[wrong].tolist())][:10]))
+    weights = np.round(weights).astype(np.int64).tolist()
+
+    # the action of each choice, following its label and its weight
+    label_names = list(label_ids)
+    bases = [label_names[label] if label != -1 else 'a%d' % i
+             for (label, i) in zip(choice_labels.tolist(), choice_indexes.tolist())]
+    weights_of_base: Dict[str, set] = {}
+    for (base, w) in zip(bases, weights):
+        weights_of_base.setdefault(base, set()).add(w)
+    action_ids: Dict[str, int] = {}
+    actions, w = [], []
+    choice_actions = []
+    state, state_actions = -1, set()
+    for (s, i, base, weight) in zip(choice_states.tolist(), choice_indexes.tolist(), bases, weights):
+        name = base if len(weights_of_base[base]) == 1 else '%s|%d' % (base, weight)
+        if s != state:
+            state, state_actions = s, set()
+        if name in state_actions:
+            name = '%s#%d' % (name, i)
+        state_actions.add(name)
+        if name not in action_ids:
+            action_ids[name] = len(actions)
+            actions.append(name)
+            w.append(weight)
+        choice_actions.append(action_ids[name])
+
+    states = import_states(sta) if sta is not None else []
+    return MDP.from_arrays(states, actions, w, sources, np.array(choice_actions, dtype=np.int64)[transition_choices],
+                           successors, probabilities, number_of_states)
+
+
+def import_states(sta: TextIO) -> List[str]:
+    """
+    Import the names of the states of a PRISM states (.sta) file (as stream), i.e., their valuations.
+
+    :param sta: the states file stream.
+    :return: the list of the names of the states.
+    """
+    sta.readline()
+    names = {}
+    for line in sta:
+        if line.strip():
+            s, valuation = line.split(':', 1)
+            names[int(s)] = valuation.strip()
+    if sorted(names) != list(range(len(names))):
+        raise ValueError('The states of the states file are not numbered from 0 to %d.' % (len(names) - 1))
+    return [names[s] for s in range(len(names))]
+
+
+def import_labels(lab: TextIO) -> Dict[str, List[int]]:
+    """
+    Import the labels of a PRISM labels (.lab) file (as stream), e.g., to get the target states of a label.
+
+    :param lab: the labels file stream.
+    :return: a dictionary that maps each label to the sorted list of the states labelled with it.
+    """
+    names = {int(i): name for (i, name) in re.findall(r'(\d+)="([^"]*)"', lab.readline())}
+    labels = {name: [] for name in names.values()}
+    for line in lab:
+        if line.strip():
+            s, label_indexes = line.split(':', 1)
+            for i in label_indexes.split():
+                labels[names[int(i)]].append(int(s))
+    return {name: sorted(states) for (name, states) in labels.items()}
+
+
+def export_to_prism(mdp: MDP, file_name: str, labels: Dict[str, List[int]] = None) -> None:
+    """
+    Serialise a MDP instance into PRISM explicit files : file_name.tra, file_name.sta, file_name.trew (the weights
+    of the actions, as transition rewards) and file_name.lab if labels are provided.
+    The action names are written as action labels, their whitespaces being replaced by '_'. The state names are written
+    as the valuations of the states if they all are valuations (e.g., if the MDP was imported from PRISM files),
+    otherwise each state s is written as the valuation (s) of a single variable s.
+
+    :param mdp: a MDP
+    :param file_name: the name of the files (without extension).
+    :param labels: (optional) a dictionary that maps labels to lists of states, e.g., {'goal': T}.
+    """
+    n = mdp.number_of_states
+    number_of_choices = sum(mdp.number_of_enabled_actions(s) for s in range(n))
+    number_of_transitions = sum(len(succ_list) for (_, _, succ_list) in mdp.choices())
+    actions = [re.sub(r'\s+', '_', mdp.act_name(alpha)) for alpha in range(mdp.number_of_actions)]
+    header = '%d %d %d\n' % (n, number_of_choices, number_of_transitions)
+    with open(file_name + '.tra', 'w') as tra, open(file_name + '.trew', 'w') as rew:
+        tra.write(header)
+        rew.write(header)
+        for s in range(n):
+            tra_lines, rew_lines = [], []
+            for (i, (alpha, succ_list)) in enumerate(mdp.alpha_successors(s)):
+                for (succ, pr) in succ_list:
+                    tra_lines.append('%d %d %d %r %s\n' % (s, i, succ, float(pr), actions[alpha]))
+                    rew_lines.append('%d %d %d %d\n' % (s, i, succ, mdp.w(alpha)))
+            tra.write(''.join(tra_lines))
+            rew.write(''.join(rew_lines))
+    names = [str(mdp.state_name(s)) for s in range(n)]
+    with open(file_name + '.sta', 'w') as sta:
+        if all(_VALUATION.fullmatch(name) for name in names):
+            sta.write('(%s)\n' % ','.join('v%d' % i for i in range(names[0].count(',') + 1)))
+            sta.writelines('%d:%s\n' % (s, name) for (s, name) in enumerate(names))
+        else:
+            sta.write('(s)\n')
+            sta.writelines('%d:(%d)\n' % (s, s) for s in range(n))
+    if labels is not None:
+        label_names = list(labels)
+        labels_of = {}
+        for (i, name) in enumerate(label_names):
+            for s in labels[name]:
+                labels_of.setdefault(s, []).append(i)
+        with open(file_name + '.lab', 'w') as lab:
+            lab.write(' '.join('%d="%s"' % (i, name) for (i, name) in enumerate(label_names)) + '\n')
+            lab.writelines('%d: %s\n' % (s, ' '.join(map(str, labels_of[s]))) for s in sorted(labels_of))
+
+
+def _header(stream: TextIO, name: str) -> List[int]:
+    fields = stream.readline().split()
+    if len(fields) != 3 or not all(field.isdigit() for field in fields):
+        raise ValueError('The first line of the %s file must be its header.' % name)
+    return [int(field) for field in fields]
@@ -15,76 +15,219 @@ The syntax of yaml that contains MDP is the following :
           weight : <w(α)>
 
 """
+import gzip
+import json
+import re
+import sys
 from functools import reduce
+from typing import Iterator, TextIO
+
 import yaml
 from structures.mdp import MDP
+from io_utils.builder import MDPBuilder
+
+# the C (libyaml) parser is much faster than the pure python one, but it is only available if PyYAML was built with it
+_Loader = getattr(yaml, 'CLoader', yaml.Loader)
+
+# names written as plain yaml scalars, the other ones being written as double-quoted scalars
+_PLAIN_NAME = re.compile(r"(?:[^\W\d]|\()(?:[\w()\[\]., '+-]*[\w()\[\].'+-])?")
+_RESERVED_NAMES = {'y', 'n', 'yes', 'no', 'true', 'false', 'on', 'off', 'null'}
 
 
 def import_from_yaml(stream) -> MDP:
     """
     Import a yaml file (as stream) into a MDP.
+    The file is read as a stream of yaml events : the transitions are stored as columns of indexes while they are
+    parsed, the names of the states and of the actions being resolved at the end (so that they can be used before being
+    declared), and the MDP is then built at once from these columns (@see io_utils.builder.MDPBuilder). Thus, the whole
+    yaml document is never built in memory.
 
     :param stream: yaml file stream.
     :return: the MDP imported from the yaml file
     """
-    mdp_dict = yaml.load(stream)['mdp']
-    mdp_states = mdp_dict['states']
-    mdp_actions = mdp_dict['actions']
-    states = [state['name'] for state in mdp_states]
-    state_from_name = {}
-    for i in range(len(mdp_states)):
-        state_from_name[states[i]] = i
-    actions = [action['name'] for action in mdp_actions]
-    w = [int(action['weight']) for action in mdp_actions]
-    action_from_name = {}
-    for i in range(len(mdp_actions)):
-        action_from_name[actions[i]] = i
-
-    mdp = MDP(states, actions, w)
-    for s in range(len(states)):
-        enabled_actions = mdp_states[s]['enabled actions']
-        for enabled_action in enabled_actions:
-            transitions = [(state_from_name[transition['target']],
-                            str_to_float(str(transition['probability'])))
-                           for transition in enabled_action['transitions']]
-
-            alpha = enabled_action['name']
-
-            # enable this action in the MDP
-            mdp.enable_action(s, action_from_name[alpha], transitions)
-
-    return mdp
-
-
-def export_to_yaml(mdp: MDP, file_name: str) -> None:
+    builder = MDPBuilder()
+    events = yaml.parse(stream, Loader=_Loader)
+    for event in events:
+        if isinstance(event, yaml.MappingStartEvent):
+            for key in _keys(events):
+                if key == 'mdp':
+                    _expect(next(events), yaml.MappingStartEvent, 'mdp')
+                    for mdp_key in _keys(events):
+                        if mdp_key == 'states':
+                            for _ in _items(events, 'states'):
+                                _parse_state(builder, events)
+                        elif mdp_key == 'actions':
+                            for _ in _items(events, 'actions'):
+                                _parse_action(builder, events)
+                        else:
+                            _skip(events)
+                else:
+                    _skip(events)
+        elif isinstance(event, (yaml.SequenceStartEvent, yaml.ScalarEvent, yaml.AliasEvent)):
+            raise ValueError('The yaml document must be a mapping with the key mdp.')
+    return builder.build()
+
+
+def _parse_state(builder: MDPBuilder, events: Iterator[yaml.Event]) -> None:
+    s = builder.add_state()
+    for key in _keys(events):
+        if key == 'name':
+            builder.name_state(s, _scalar(events, 'name'))
+        elif key == 'enabled actions':
+            for _ in _items(events, 'enabled actions'):
+                _parse_enabled_action(builder, s, events)
+        else:
+            _skip(events)
+
+
+def _parse_enabled_action(builder: MDPBuilder, s: int, events: Iterator[yaml.Event]) -> None:
+    # the name of the action may come after its transitions
+    alpha = -1
+    transitions = []
+    for key in _keys(events):
+        if key == 'name':
+            alpha = builder.action_id(_scalar(events, 'name'))
+        elif key == 'transitions':
+            for _ in _items(events, 'transitions'):
+                succ, pr = -1, None
+                for transition_key in _keys(events):
+                    if transition_key == 'target':
+                        succ = builder.state_id(_scalar(events, 'target'))
+                    elif transition_key == 'probability':
+                        pr = str_to_float(_scalar(events, 'probability'))
+                    else:
+                        _skip(events)
+                if succ == -1 or pr is None:
+                    raise ValueError('A transition of the state %d of the yaml file has no target or no probability.'
+                                     % s)
+                transitions.append((succ, pr))
+        else:
+            _skip(events)
+    if alpha == -1:
+        raise ValueError('An enabled action of the state %d of the yaml file has no name.' % s)
+    builder.add_transitions(s, alpha, transitions)
+
+
+def _parse_action(builder: MDPBuilder, events: Iterator[yaml.Event]) -> None:
+    name, weight = None, None
+    for key in _keys(events):
+        if key == 'name':
+            name = _scalar(events, 'name')
+        elif key == 'weight':
+            weight = int(_scalar(events, 'weight'))
+        else:
+            _skip(events)
+    if name is None or weight is None:
+        raise ValueError('The action %d of the yaml file has no name or no weight.' % len(builder.actions))
+    builder.add_action(name, weight)
+
+
+def _keys(events: Iterator[yaml.Event]) -> Iterator[str]:
+    # keys of the mapping whose start event has just been read, the value of each key having to be read before the
+    # next key is asked for
+    for event in events:
+        if isinstance(event, yaml.MappingEndEvent):
+            return
+        if not isinstance(event, yaml.ScalarEvent):
+            raise ValueError('Only scalar keys are allowed in the yaml file (line %d).' % (event.start_mark.line + 1))
+        yield event.value
+
+
+def _items(events: Iterator[yaml.Event], name: str) -> Iterator[None]:
+    # items of the sequence of mappings that is the value of the key in parameter, the item having to be read (from its
+    # first key) before the next item is asked for
+    _expect(next(events), yaml.SequenceStartEvent, name)
+    for event in events:
+        if isinstance(event, yaml.SequenceEndEvent):
+            return
+        _expect(event, yaml.MappingStartEvent, name)
+        yield
+
+
+def _scalar(events: Iterator[yaml.Event], name: str) -> str:
+    event = next(events)
+    _expect(event, yaml.ScalarEvent, name)
+    return event.value
+
+
+def _skip(events: Iterator[yaml.Event]) -> None:
+    # skip a value, i.e., a scalar or a whole collection
+    depth = 0
+    for event in events:
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _expect(event: yaml.Event, event_type: type, name: str) -> None:
+    if isinstance(event, yaml.AliasEvent):
+        raise ValueError('Aliases are not allowed in the yaml file (line %d).' % (event.start_mark.line + 1))
+    if not isinstance(event, event_type):
+        raise ValueError('Unexpected value for %s in the yaml file (line %d).' % (name, event.start_mark.line + 1))
+
+
+def export_to_yaml(mdp: MDP, file_name: str, compress=False) -> None:
+    """
+    Serialise a MDP instance into a yaml file (@see write_yaml).
+
+    :param mdp: a MDP
+    :param file_name: the name of the yaml file (without extension). If it is empty, the yaml is printed in the console.
+    :param compress: (optional) set this parameter to True to compress the yaml file with gzip (.yaml.gz).
+    """
+    if not file_name:
+        write_yaml(mdp, sys.stdout)
+    elif compress:
+        with gzip.open(file_name + '.yaml.gz', 'wt', encoding='utf-8') as yaml_file:
+            write_yaml(mdp, yaml_file)
+    else:
+        with open(file_name + '.yaml', 'w', encoding='utf-8') as yaml_file:
+            write_yaml(mdp, yaml_file)
+
+
+def write_yaml(mdp: MDP, stream: TextIO) -> None:
     """
-    Serialise a MDP instance into a yaml file.
+    Write a MDP in yaml into a text stream, state by state, without building the yaml document in memory.
 
     :param mdp: a MDP
-    :param file_name: the name of the yaml file
+    :param stream: a text stream, e.g., a file opened in writing mode.
     """
-    mdp_dict = {'mdp': {'states': [], 'actions': []}}
+    states = [_yaml_name(mdp.state_name(s)) for s in range(mdp.number_of_states)]
+    actions = [_yaml_name(mdp.act_name(alpha)) for alpha in range(mdp.number_of_actions)]
+    stream.write('mdp:\n  states:\n')
     for s in range(mdp.number_of_states):
-        mdp_dict['mdp']['states'].append({})
-        mdp_dict['mdp']['states'][-1]['name'] = mdp.state_name(s)
-        mdp_dict['mdp']['states'][-1]['enabled actions'] = []
-        for (alpha, succ_list) in mdp.alpha_successors(s):
-            mdp_dict['mdp']['states'][-1]['enabled actions'].append({})
-            mdp_dict['mdp']['states'][-1]['enabled actions'][-1]['name'] = mdp.act_name(alpha)
-            mdp_dict['mdp']['states'][-1]['enabled actions'][-1]['transitions'] = []
-            for (succ, pr) in succ_list:
-                mdp_dict['mdp']['states'][-1]['enabled actions'][-1]['transitions'].append({})
-                mdp_dict['mdp']['states'][-1]['enabled actions'][-1]['transitions'][-1]['target'] = mdp.state_name(succ)
-                mdp_dict['mdp']['states'][-1]['enabled actions'][-1]['transitions'][-1]['probability'] = pr
+        lines = ['  - name: ', states[s], '\n']
+        if not mdp.number_of_enabled_actions(s):
+            lines.append('    enabled actions: []\n')
+        else:
+            lines.append('    enabled actions:\n')
+            for (alpha, succ_list) in mdp.alpha_successors(s):
+                lines += ['    - name: ', actions[alpha], '\n      transitions:\n']
+                for (succ, pr) in succ_list:
+                    lines += ['      - target: ', states[succ],
+                              '\n        probability: ', _yaml_float(pr), '\n']
+        stream.write(''.join(lines))
+    stream.write('  actions:\n')
     for alpha in range(mdp.number_of_actions):
-        mdp_dict['mdp']['actions'].append({})
-        mdp_dict['mdp']['actions'][-1]['name'] = mdp.act_name(alpha)
-        mdp_dict['mdp']['actions'][-1]['weight'] = mdp.w(alpha)
-    if file_name:
-        with open(file_name + '.yaml', 'w') as yaml_file:
-            yaml.dump(mdp_dict, yaml_file, default_flow_style=False)
-    else:
-        print(yaml.dump(mdp_dict, default_flow_style=False))
+        stream.write('  - name: %s\n    weight: %d\n' % (actions[alpha], mdp.w(alpha)))
+
+
+def _yaml_name(name) -> str:
+    name = str(name)
+    if _PLAIN_NAME.fullmatch(name) and name.lower() not in _RESERVED_NAMES:
+        return name
+    # a json string is a valid yaml double-quoted scalar
+    return json.dumps(name, ensure_ascii=False)
+
+
+def _yaml_float(pr: float) -> str:
+    # yaml 1.1 floats need a dot in their mantissa (e.g., 1.0e-05 instead of 1e-05)
+    pr = repr(float(pr))
+    if 'e' in pr and '.' not in pr:
+        return pr.replace('e', '.0e')
+    return pr
 
 
 def str_to_float(string: str) -> float:
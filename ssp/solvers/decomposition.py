@@ -0,0 +1,180 @@
+"""
+This module contains graph decompositions of MDPs that can be used as preprocessing stages by the solvers, like
+connected_to or pr_max_1 in the reachability module.
+"""
+from structures.mdp import MDP
+from typing import List, Callable, Iterable, Tuple
+
+import numpy as np
+
+SMALL_COMPONENT = 32
+"""Number of states under which a SCC is iterated state by state (@see iterate_component) rather than with sparse
+matrix-vector products.
+"""
+
+
+def strongly_connected_components(mdp: MDP, states: Iterable[int] = None,
+                                  enabled: Callable[[int, int], bool] = None) -> List[List[int]]:
+    """
+    Compute the strongly connected components (SCCs) of the underlying graph of the MDP, with Tarjan's algorithm.
+    The components are given in reverse topological order : each component comes after all the components that can
+    be reached from it. Thus, solving the components in this order allows to substitute the values of the already
+    solved components as constants.
+
+    :param mdp: a MDP.
+    :param states: (optional) a subset of states of the MDP. If provided, only the SCCs of the subgraph induced by these
+                   states are computed.
+    :param enabled: (optional) a function such that enabled(s, α) is False iff the edges of the action α of s must be
+                    ignored in the underlying graph.
+    :return: the list of the SCCs of the (sub)graph, in reverse topological order.
+    """
+    if states is None:
+        states = range(mdp.number_of_states)
+    states = list(states)
+    in_graph = [False] * mdp.number_of_states
+    for s in states:
+        in_graph[s] = True
+
+    def successors(s: int) -> List[int]:
+        return list({succ for (alpha, succ_list) in mdp.alpha_successors(s) if enabled is None or enabled(s, alpha)
+                     for (succ, _) in succ_list if in_graph[succ]})
+
+    return _tarjan(states, successors, mdp.number_of_states)
+
+
+def is_trivial(mdp: MDP, component: List[int], enabled: Callable[[int, int], bool] = None) -> bool:
+    """
+    Check if a SCC is trivial, i.e., if it is a single state without self-loop.
+
+    :param mdp: a MDP.
+    :param component: a SCC of the MDP.
+    :param enabled: (optional) @see strongly_connected_components.
+    :return: True iff the SCC is trivial.
+    """
+    if len(component) > 1:
+        return False
+    s = component[0]
+    return not [succ for (alpha, succ_list) in mdp.alpha_successors(s) if enabled is None or enabled(s, alpha)
+                for (succ, _) in succ_list if succ == s]
+
+
+def iterate_component(values: np.ndarray, choices: List[Tuple[int, List[Tuple[float, Tuple[Tuple[int, float], ...]]]]],
+                      optimum: Callable, epsilon: float, change: Callable[[float, float], float]) -> None:
+    """
+    Iterate the Bellman operator state by state on a small SCC until convergence (Gauss-Seidel sweeps), the values
+    of the states out of the SCC being constants : values[s] = optimum_{α ∈ A(s)} c(α) + Σ_{s'} ∆(s, α, s') values[s'].
+
+    :param values: the values of the states of the MDP, updated in place for the states of the SCC.
+    :param choices: a list of tuples (s, choices_s) for the states s of the SCC, where choices_s is the list of the pairs
+                    (c(α), α-succ) of the actions α of s (@see MDP.alpha_successors).
+    :param optimum: max or min.
+    :param epsilon: the iteration stops when the greatest change of a value during a sweep is <= epsilon.
+    :param change: a function such that change(new_value, value) is the change of a value.
+    """
+    # local copy of the values involved in the SCC
+    local = {succ: float(values[succ]) for (_, choices_s) in choices
+             for (_, succ_list) in choices_s for (succ, _) in succ_list}
+    delta = epsilon + 1
+    while delta > epsilon:
+        delta = 0.
+        for (s, choices_s) in choices:
+            new_value = optimum(c + sum(pr * local[succ] for (succ, pr) in succ_list) for (c, succ_list) in choices_s)
+            delta = max(delta, change(new_value, local[s]))
+            local[s] = new_value
+    for (s, _) in choices:
+        values[s] = local[s]
+
+
+def _tarjan(states: List[int], successors: Callable[[int], List[int]], n: int) -> List[List[int]]:
+    # iterative version of Tarjan's algorithm (the recursive one reaches the recursion limit on long chains)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in states:
+        if index[root] != -1:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors(root)))]
+        while work:
+            s, succ_iterator = work[-1]
+            for succ in succ_iterator:
+                if index[succ] == -1:
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack[succ] = True
+                    work.append((succ, iter(successors(succ))))
+                    break
+                elif on_stack[succ]:
+                    lowlink[s] = min(lowlink[s], index[succ])
+            else:
+                work.pop()
+                if work:
+                    pred = work[-1][0]
+                    lowlink[pred] = min(lowlink[pred], lowlink[s])
+                if lowlink[s] == index[s]:
+                    component = []
+                    while True:
+                        succ = stack.pop()
+                        on_stack[succ] = False
+                        component.append(succ)
+                        if succ == s:
+                            break
+                    components.append(component)
+    return components
+
+
+def maximal_end_components(mdp: MDP, states: Iterable[int] = None) -> List[List[int]]:
+    """
+    Compute the maximal end components (MECs) of the MDP.
+    An end component is a set of states C such that, with only the actions of the states of C whose successors all
+    belong to C, the subgraph induced by C is strongly connected. Thus, a strategy can stay forever in C and visit each
+    of its states infinitely often.
+    The MECs are computed by refining the SCCs of the states with at least one enabled action : the actions that leave
+    their SCC are removed, then the states without any remaining action are removed, and the SCCs of the remaining states are computed again, until no action has to
+    be removed anymore.
+
+    :param mdp: a MDP.
+    :param states: (optional) a subset of states of the MDP. If provided, only the MECs included in this subset are
+                   computed (i.e., the actions that can leave this subset are ignored).
+    :return: the list of the MECs of the MDP, each MEC being the list of its states.
+    """
+    if states is None:
+        states = range(mdp.number_of_states)
+    # component[s] is the label of the current candidate component of s, -1 if s can not belong to a MEC
+    component = [-1] * mdp.number_of_states
+    disabled_action = [set() for _ in range(mdp.number_of_states)]
+    components = []
+    # a state without any enabled action can not stay in an end component
+    candidates = [[s for s in states if mdp.number_of_enabled_actions(s)]]
+    counter = 0
+    while candidates:
+        for C in strongly_connected_components(mdp, candidates.pop(),
+                                               enabled=lambda s, alpha: alpha not in disabled_action[s]):
+            counter += 1
+            for s in C:
+                component[s] = counter
+            # remove the actions that leave C
+            refined = False
+            for s in C:
+                for (alpha, succ_list) in mdp.alpha_successors(s):
+                    if alpha not in disabled_action[s] and \
+                            [succ for (succ, _) in succ_list if component[succ] != counter]:
+                        disabled_action[s].add(alpha)
+                        refined = True
+            remaining = [s for s in C if len(disabled_action[s]) < mdp.number_of_enabled_actions(s)]
+            for s in C:
+                if len(disabled_action[s]) == mdp.number_of_enabled_actions(s):
+                    component[s] = -1
+            if not refined:
+                components.append(C)
+            elif remaining:
+                candidates.append(remaining)
+    return components
+
@@ -0,0 +1,110 @@
+"""
+This module contains an in-process LP backend for the solvers, based on the HiGHS solver of scipy
+(scipy.optimize.linprog).
+The constraint matrices are directly assembled as sparse matrices from the transition matrix of the MDP
+(@see structures.mdp.CompactMDP), instead of building puLp expressions term by term and solving them in an external
+process.
+
+This backend is selected by passing solver=HIGHS (i.e., solver='highs') to the solvers
+(reachability.reach, sspe.min_expected_cost and sspp.force_short_paths_from).
+"""
+import numpy as np
+import scipy.sparse
+from scipy.optimize import linprog
+
+from structures.mdp import MDP, CompactMDP
+from typing import List
+
+HIGHS = 'highs'
+"""Value of the solver parameter of the solvers that selects this backend.
+"""
+
+
+def is_highs(solver) -> bool:
+    """
+    Check if a solver parameter selects this backend.
+
+    :param solver: the solver parameter of a solver.
+    :return: True iff the solver is HIGHS.
+    """
+    return isinstance(solver, str) and solver.lower() == HIGHS
+
+
+def reach_lp(mdp: MDP, x: List[float], untreated_states: List[int], msg=0) -> List[float]:
+    """
+    Solve the linear program of the maximum reachability probability problem for the untreated states :
+        minimize Σ x[s] such that x[s] >= Σ_{s'} ∆(s, α, s') x[s'] for each α ∈ A(s), 0 <= x[s] <= 1,
+    where the values of the other states are already known.
+
+    :param mdp: a MDP.
+    :param x: a list such that x[s] is the maximum reachability probability of s if s is not an untreated state.
+    :param untreated_states: the states whose maximum reachability probability has to be computed.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: the list x such that x[s] is the maximum reachability probability of s.
+    """
+    compact = CompactMDP.from_mdp(mdp)
+    U = np.array(untreated_states)
+    choices = compact.choices_of(U)
+    # Σ_{s' ∈ U} ∆(s, α, s') x[s'] - x[s] <= - Σ_{s' ∉ U} ∆(s, α, s') x[s']
+    A, b = _constraints(compact, x, U, choices, sign=1)
+    solution = _solve(np.ones(len(U)), A, b, (0, 1), msg)
+    x = list(x)
+    for (i, s) in enumerate(untreated_states):
+        x[s] = float(solution[i])
+    return x
+
+
+def min_expected_cost_lp(mdp: MDP, x: List[float], variables: List[int], expect_inf: List[bool],
+                         msg=0) -> List[float]:
+    """
+    Solve the linear program of the minimum expected length of paths problem :
+        maximize Σ x[s] such that x[s] <= w(α) + Σ_{s'} ∆(s, α, s') x[s'] for each α ∈ A(s) whose successors have a finite
+        expected length, x[s] >= 0,
+    where the values of the other states are already known.
+
+    :param mdp: a MDP.
+    :param x: a list such that x[s] is the minimum expected length of s if s is not a variable.
+    :param variables: the states whose minimum expected length has to be computed.
+    :param expect_inf: a list such that expect_inf[s] is True iff the minimum expected length of s is infinite.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: the list x such that x[s] is the minimum expected length of s.
+    """
+    compact = CompactMDP.from_mdp(mdp)
+    V = np.array(variables)
+    choices = compact.choices_of(V)
+    inf = np.array(expect_inf, dtype=bool)
+    # only keep the choices whose successors all have a finite expected length
+    finite = ~np.maximum.reduceat(inf[compact.successors], compact.transition_offsets[:-1]).astype(bool)
+    choices = choices[finite[choices]]
+    known = [0. if expect_inf[s] else x_s for (s, x_s) in enumerate(x)]
+    # x[s] - Σ_{s' ∈ V} ∆(s, α, s') x[s'] <= w(α) + Σ_{s' ∉ V} ∆(s, α, s') x[s']
+    A, b = _constraints(compact, known, V, choices, sign=-1)
+    b += np.array(compact._w, dtype=np.float64)[compact.choice_actions[choices]]
+    solution = _solve(-np.ones(len(V)), A, b, (0, None), msg)
+    x = list(x)
+    for (i, s) in enumerate(variables):
+        x[s] = float(solution[i])
+    return x
+
+
+def _constraints(compact: CompactMDP, x: List[float], variables: np.ndarray, choices: np.ndarray, sign: int):
+    # rows sign * (Σ_{s' ∈ variables} ∆(s, α, s') x[s'] - x[s]) for each choice (s, α), and the right hand side
+    # - sign * Σ_{s' ∉ variables} ∆(s, α, s') x[s']
+    n = compact.number_of_states
+    index = np.full(n, -1, dtype=np.int64)
+    index[variables] = np.arange(len(variables))
+    known = np.array([0. if index[s] != -1 else x_s for (s, x_s) in enumerate(x)], dtype=np.float64)
+    P = compact.transition_matrix()[choices]
+    rows = np.arange(len(choices))
+    E = scipy.sparse.csr_matrix((np.ones(len(choices)), (rows, index[compact.choice_states[choices]])),
+                                shape=(len(choices), len(variables)))
+    A = sign * (P[:, variables] - E)
+    b = -sign * (P @ known)
+    return A.tocsr(), b
+
+
+def _solve(c: np.ndarray, A: scipy.sparse.csr_matrix, b: np.ndarray, bounds, msg) -> np.ndarray:
+    result = linprog(c, A_ub=A, b_ub=b, bounds=bounds, method='highs', options={'disp': bool(msg)})
+    if result.status != 0:
+        raise RuntimeError('HiGHS could not solve the linear program : %s' % result.message)
+    return result.x
@@ -13,25 +13,42 @@ Usage:
     where the arguments are
         :<mdp-yaml>: the path to a yaml file that represents a MDP
         :t1 t2 <...> tn: the target states labels of the MDP
+
+    options : the plot options --mode, --around, --k, --max-nodes and --no-view (@see io_utils.graphviz.parse_options).
 """
 import pulp
+import numpy as np
 import os
 import sys
 
 myPath = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, myPath + '/../')
 
-from solvers import print_optimal_solution
-from structures.mdp import MDP
+from solvers import print_optimal_solution, linear_programming
+from solvers.decomposition import strongly_connected_components, is_trivial, maximal_end_components, \
+    iterate_component, SMALL_COMPONENT
+from structures.mdp import MDP, CompactMDP, QuotientMDP, SubMDP
+from structures.util import concatenated_ranges
 from typing import List, Callable
 from collections import deque
+from heapq import heappush, heappop
 
 v: List[float]
 """Last optimal solution.
 """
 
+_LP_TOLERANCE = 1e-9
+"""Tolerance used to compare the actions of the states following the solution of a linear program, whose values are only
+exact up to the feasibility tolerance of the LP solver and to the rounding of the sums of probabilities.
+"""
+
+_BLOCK_SIZE = 4096
+"""Number of states updated together during a Gauss-Seidel sweep of the value iteration.
+"""
+
 
-def reach(mdp: MDP, T: List[int], msg=0, solver: pulp=pulp.GLPK_CMD()) -> List[float]:
+def reach(mdp: MDP, T: List[int], msg=0, solver: pulp=pulp.GLPK_CMD(), method: str='lp',
+          epsilon: float=1e-8, relative: bool=False) -> List[float]:
     """
     Compute the maximum reachability probability to T for each state of the MDP in parameter and get a vector x (as list)
     such that x[s] is the maximum reachability probability to T of the state s.
@@ -39,9 +56,18 @@ def reach(mdp: MDP, T: List[int], msg=0, solver: pulp=pulp.GLPK_CMD()) -> List[f
     :param mdp: a MDP for which the maximum reachability probability will be computed for each of its states.
     :param T: a list of target states.
     :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
-    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX).
+    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX), or 'highs' to solve the linear program
+                   in-process with scipy (@see solvers.linear_programming).
+    :param method: (optional) 'lp' (default) to compute the probabilities with a linear program, 'vi' to compute them
+                   with value iteration (@see value_iteration) or 'topological' to compute them SCC by SCC
+                   (@see topological_value_iteration).
+    :param epsilon: (optional) convergence threshold of the value iteration (ignored if method is 'lp').
+    :param relative: (optional) set this parameter to True to use a relative convergence criterion instead of an absolute
+                     one for the value iteration (ignored if method is 'lp').
     :return: the a list x such that x[s] is the maximum reachability probability to T.
     """
+    if method not in ('lp', 'vi', 'topological'):
+        raise ValueError("Unknown method '%s' (available methods : 'lp', 'vi', 'topological')." % method)
     states = list(range(mdp.number_of_states))
     # x[s] is the Pr^max to reach T
     x = [-1] * mdp.number_of_states
@@ -54,10 +80,41 @@ def reach(mdp: MDP, T: List[int], msg=0, solver: pulp=pulp.GLPK_CMD()) -> List[f
     for s in pr_max_1(mdp, T, connected=connected):
         x[s] = 1
 
-    # if there exist some other states such that Pr^max to reach T is in ]0, 1[, a LP is generated for these states
+    # if there exist some other states such that Pr^max to reach T is in ]0, 1[, the value iterations solve them on the
+    # quotient of the MDP by their maximal end components (each end component is collapsed into a single state, with
+    # the same value), where they converge faster. The linear program does not need it.
     untreated_states = list(filter(lambda s: x[s] == -1, states))
-    if untreated_states:
+    components = maximal_end_components(mdp, untreated_states) if untreated_states and method != 'lp' else []
+    if components:
+        quotient = QuotientMDP(mdp, components, validation=False)
+        x_quotient = [x[quotient.convert(q)[0]] for q in range(quotient.number_of_states)]
+        x_quotient = _solve(quotient, [quotient.state_of(t) for t in T], x_quotient,
+                            list(filter(lambda q: x_quotient[q] == -1, range(quotient.number_of_states))),
+                            msg=msg, solver=solver, method=method, epsilon=epsilon, relative=relative)
+        x = quotient.lift_values(x_quotient)
+    elif untreated_states:
+        x = _solve(mdp, T, x, untreated_states, msg=msg, solver=solver, method=method, epsilon=epsilon,
+                   relative=relative)
+
+    if msg:
+        print_optimal_solution(x, states, mdp.state_name)
 
+    global v
+    v = x
+
+    return x
+
+
+def _solve(mdp: MDP, T: List[int], x: List[float], untreated_states: List[int], msg, solver: pulp, method: str,
+           epsilon: float, relative: bool) -> List[float]:
+    # compute the maximum reachability probability to T of the untreated states with the method in parameter
+    if method == 'vi':
+        x = value_iteration(mdp, T, x, untreated_states, epsilon=epsilon, relative=relative, msg=msg)
+    elif method == 'topological':
+        x = topological_value_iteration(mdp, x, untreated_states, epsilon=epsilon, relative=relative, msg=msg)
+    elif linear_programming.is_highs(solver):
+        x = linear_programming.reach_lp(mdp, x, untreated_states, msg=msg)
+    else:
         # formulate the LP problem
         linear_program = pulp.LpProblem("reachability", pulp.LpMinimize)
         # initialize variables
@@ -80,27 +137,144 @@ def reach(mdp: MDP, T: List[int], msg=0, solver: pulp=pulp.GLPK_CMD()) -> List[f
         for s in untreated_states:
             x[s] = x[s].varValue
 
+    return x
+
+
+def value_iteration(mdp: MDP, T: List[int], x: List[float], untreated_states: List[int],
+                    epsilon: float=1e-8, relative: bool=False, msg=0) -> List[float]:
+    """
+    Compute the maximum reachability probability to T of the untreated states by value iteration, i.e., by iterating
+    the Bellman operator x[s] = max_{α ∈ A(s)} Σ_{s'} ∆(s, α, s') x[s'] from x[s] = 0 on these states.
+    The states are sorted by their minimal number of steps to T and updated by blocks in a Gauss-Seidel fashion :
+    each block of states is updated with a sparse matrix-vector product using the values already updated during the
+    current sweep.
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param x: a list such that x[s] is 0 or 1 if the maximum reachability probability to T of s is known to be 0 or 1.
+    :param untreated_states: the states whose maximum reachability probability to T is in ]0, 1[.
+    :param epsilon: (optional) the iteration stops when the greatest change of a value during a sweep is <= epsilon.
+    :param relative: (optional) set this parameter to True to divide the change of each value by this value in the
+                     convergence criterion.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: a list x such that x[s] is the maximum reachability probability to T.
+    """
+    compact = CompactMDP.from_mdp(mdp)
+    values = np.array([0. if x_s == -1 else x_s for x_s in x])
+
+    steps = minimal_steps_number_to(mdp, T)
+    blocks = _bellman_blocks(compact, sorted(untreated_states, key=lambda s: steps[s]))
+    iterations = _iterate(values, blocks, epsilon, relative)
     if msg:
-        print_optimal_solution(x, states, mdp.state_name)
+        print('Value iteration : %d sweeps (convergence threshold %g).' % (iterations, epsilon))
+
+    return values.tolist()
 
-    global v
-    v = x
+
+def topological_value_iteration(mdp: MDP, x: List[float], untreated_states: List[int],
+                                epsilon: float=1e-8, relative: bool=False, msg=0) -> List[float]:
+    """
+    Compute the maximum reachability probability to T of the untreated states SCC by SCC
+    (@see solvers.decomposition.strongly_connected_components).
+    The SCCs of the untreated states are solved in reverse topological order, the values of the states of the already
+    solved SCCs being constants. A trivial SCC (a single state without self-loop) is solved by one Bellman update, the
+    other ones by value iteration (@see value_iteration), state by state for the small ones.
+
+    :param mdp: a MDP.
+    :param x: a list such that x[s] is 0 or 1 if the maximum reachability probability to T of s is known to be 0 or 1.
+    :param untreated_states: the states whose maximum reachability probability to T is in ]0, 1[.
+    :param epsilon: (optional) convergence threshold of the value iteration of each SCC.
+    :param relative: (optional) @see value_iteration.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: a list x such that x[s] is the maximum reachability probability to T.
+    """
+    compact = None
+    values = np.array([0. if x_s == -1 else x_s for x_s in x])
+    components = strongly_connected_components(mdp, untreated_states)
+    trivial = 0
+    for component in components:
+        if is_trivial(mdp, component):
+            trivial += 1
+            s = component[0]
+            values[s] = max(sum(pr * values[succ] for (succ, pr) in succ_list)
+                            for (_, succ_list) in mdp.alpha_successors(s))
+        elif len(component) < SMALL_COMPONENT:
+            iterate_component(values, [(s, [(0., succ_list) for (_, succ_list) in mdp.alpha_successors(s)])
+                                       for s in component], max, epsilon,
+                              (lambda new_value, value: abs(new_value - value) / max(new_value, np.finfo(float).tiny))
+                              if relative else (lambda new_value, value: abs(new_value - value)))
+        else:
+            if compact is None:
+                compact = CompactMDP.from_mdp(mdp)
+            _iterate(values, _bellman_blocks(compact, component), epsilon, relative)
+    x = values.tolist()
+    if msg:
+        print('Topological value iteration : %d SCCs (%d trivial).' % (len(components), trivial))
 
     return x
 
 
-def build_strategy(mdp: MDP, T: List[int], solver: pulp=pulp.GLPK_CMD(), msg=0) -> Callable[[int], int]:
+def _bellman_blocks(compact: CompactMDP, states: List[int]) -> List[tuple]:
+    # split the states into blocks of _BLOCK_SIZE states, each one with the transition matrix of its choices and the
+    # position of the first choice of each state among them
+    P = compact.transition_matrix()
+    blocks = []
+    for i in range(0, len(states), _BLOCK_SIZE):
+        block = np.array(states[i:i + _BLOCK_SIZE])
+        lo, hi = compact.choice_offsets[block], compact.choice_offsets[block + 1]
+        first_choices = np.concatenate(([0], np.cumsum(hi - lo)[:-1]))
+        blocks.append((block, P[compact.choices_of(block)], first_choices))
+    return blocks
+
+
+def _iterate(values: np.ndarray, blocks: List[tuple], epsilon: float, relative: bool) -> int:
+    # Gauss-Seidel sweeps of the Bellman operator on the blocks until convergence, get the number of sweeps
+    iterations = 0
+    delta = epsilon + 1
+    while delta > epsilon:
+        delta = 0.
+        for (block, P_block, first_choices) in blocks:
+            new_values = np.maximum.reduceat(P_block @ values, first_choices)
+            change = np.abs(new_values - values[block])
+            if relative:
+                change = change / np.maximum(new_values, np.finfo(float).tiny)
+            delta = max(delta, change.max())
+            values[block] = new_values
+        iterations += 1
+    return iterations
+
+
+def build_strategy(mdp: MDP, T: List[int], solver: pulp=pulp.GLPK_CMD(), msg=0, method: str='lp',
+                   epsilon: float=1e-8) -> Callable[[int], int]:
     """
     Build a memoryless strategy that returns the action that maximises the reachability probability to T
     of each state s in parameter of this strategy.
 
     :param mdp: a MDP for which the strategy will be built.
     :param T: a target states list.
-    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX).
+    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX), or 'highs' (@see reach).
+    :param method: (optional) the method used to compute the maximum reachability probabilities (@see reach).
+    :param epsilon: (optional) convergence threshold of the value iteration. It is also used as tolerance to compare
+                    the actions of the states (ignored if method is 'lp', the tolerance being then _LP_TOLERANCE).
     :return: the strategy built.
     """
-    x = reach(mdp, T, solver=solver, msg=msg)
+    x = reach(mdp, T, solver=solver, msg=msg, method=method, epsilon=epsilon)
+    tolerance = epsilon if method != 'lp' else _LP_TOLERANCE
+
+    # the strategy is built on the quotient of the MDP by the maximal end components of the states whose maximum
+    # reachability probability is in ]0, 1[, then lifted to the MDP
+    components = maximal_end_components(mdp, filter(lambda s: 0 < x[s] < 1, range(mdp.number_of_states)))
+    if components:
+        quotient = QuotientMDP(mdp, components, validation=False)
+        strategy = _optimal_strategy(quotient, [quotient.state_of(t) for t in T],
+                                     [x[quotient.convert(q)[0]] for q in range(quotient.number_of_states)], tolerance)
+        return quotient.lift_strategy(lambda q: strategy[q])
+    strategy = _optimal_strategy(mdp, T, x, tolerance)
+    return lambda s: strategy[s]
+
 
+def _optimal_strategy(mdp: MDP, T: List[int], x: List[float], tolerance: float) -> List[int]:
+    # choose for each state s an action that maximises the reachability probability to T and that leads to T in M^max
     states = range(mdp.number_of_states)
     act_max = [[] for _ in states]
 
@@ -109,22 +283,14 @@ def build_strategy(mdp: MDP, T: List[int], solver: pulp=pulp.GLPK_CMD(), msg=0)
         pr_max = 0
         for (alpha, successor_list) in mdp.alpha_successors(s):
             pr = sum(map(lambda succ_pr: succ_pr[1] * x[succ_pr[0]], successor_list))
-            if pr == pr_max:
+            if abs(pr - pr_max) <= tolerance:
                 act_max[s].append(alpha)
             elif pr > pr_max:
                 pr_max = pr
                 act_max[s] = [alpha]
 
-    # compute M^max
-    mdp_max = MDP([], [], mdp._w, mdp.number_of_states, validation=False)
-    for s in states:
-        i = 0
-        for (alpha, successor_list) in mdp.alpha_successors(s):
-            if alpha == act_max[s][i]:
-                i += 1
-                mdp_max.enable_action(s, alpha, successor_list)
-            if i == len(act_max[s]):
-                break
+    # M^max, as a view of the MDP restricted to the actions of act_max
+    mdp_max = SubMDP(mdp, enabled=lambda s, alpha: alpha in act_max[s])
 
     # compute the final strategy
     minimal_steps = minimal_steps_number_to(mdp_max, T)
@@ -140,32 +306,30 @@ def build_strategy(mdp: MDP, T: List[int], solver: pulp=pulp.GLPK_CMD(), msg=0)
                         break
                 if len(strategy) == s + 1:
                     break
-    return lambda s: strategy[s]
+    return strategy
 
 
 def connected_to(mdp: MDP, T: List[int]) -> List[bool]:
     """
     Compute the states connected to T.
-    For this purpose, a backward breadth-first search algorithm on the underlying graph of the MDP is used.
+    For this purpose, a backward breadth-first search algorithm on the underlying graph of the MDP is used. It is run
+    layer by layer on the predecessors index of the MDP (@see MDP.predecessor_arrays).
 
     :param mdp: a MDP.
     :param T: a list of target states of the MDP.
     :return: a list 'marked' such that, for each state s of the MDP, marked[s] = True if s is connected to T in
              the underlying graph of the MDP.
     """
-    marked = [False] * mdp.number_of_states
-    for t in T:
-        marked[t] = True
-    next = deque([])
-    for t in T:
-        next.extend(mdp.pred(t))
-    while len(next) > 0:
-        pred = next.pop()
-        if not marked[pred]:
-            marked[pred] = True
-            for predecessor in mdp.pred(pred):
-                next.appendleft(predecessor)
-    return marked
+    offsets, pred_states, _ = mdp.predecessor_arrays()
+    marked = np.zeros(mdp.number_of_states, dtype=bool)
+    layer = np.unique(np.asarray(T, dtype=np.int64))
+    marked[layer] = True
+    while len(layer) > 0:
+        # the predecessors of the states of the current layer that are not marked yet form the next layer
+        predecessors = pred_states[concatenated_ranges(offsets, layer)]
+        layer = np.unique(predecessors[~marked[predecessors]])
+        marked[layer] = True
+    return marked.tolist()
 
 
 def minimal_steps_number_to(mdp: MDP, T: List[int]) -> List[float]:
@@ -179,28 +343,59 @@ def minimal_steps_number_to(mdp: MDP, T: List[int]) -> List[float]:
     :return: a list 'steps' such that, for each state s of the MDP, steps[s] = n where n is the minimal number of steps
              to reach T in the underlying graph of the MDP.
     """
-    steps = [float('inf')] * mdp.number_of_states
-    for t in T:
-        steps[t] = 0
-    next = deque([])
+    offsets, pred_states, _ = mdp.predecessor_arrays()
+    steps = np.full(mdp.number_of_states, float('inf'))
+    layer = np.unique(np.asarray(T, dtype=np.int64))
+    i = 0
+    while len(layer) > 0:
+        steps[layer] = i
+        predecessors = pred_states[concatenated_ranges(offsets, layer)]
+        layer = np.unique(predecessors[steps[predecessors] == float('inf')])
+        i += 1
+    return steps.tolist()
+
+
+def minimal_weight_to(mdp: MDP, T: List[int]) -> List[float]:
+    """
+    Compute the minimal weight of the paths to T in the underlying graph of the MDP, where each edge (s, s') labeled
+    with an action α weighs w(α) (i.e., the length of the shortest path to T, in term of weights). It is computed with
+    Dijkstra's algorithm, backward from T through the α-predecessors of the states.
+    Since all strategies follow paths of the underlying graph, no path from s reaches T with a length < d[s].
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :return: a list 'd' such that, for each state s of the MDP, d[s] is the minimal weight of the paths from s to T in
+             the underlying graph of the MDP (float('inf') if s is not connected to T).
+    """
+    d = [float('inf')] * mdp.number_of_states
+    next = []
     for t in T:
-        next.extend(mdp.pred(t))
-    i = 1
+        d[t] = 0
+        heappush(next, (0, t))
     while len(next) > 0:
-        predecessors = next
-        next = deque([])
-        while len(predecessors) > 0:
-            pred = predecessors.pop()
-            if steps[pred] > i:
-                steps[pred] = i
-                next.extend(mdp.pred(pred))
-        i += 1
-    return steps
+        d_s, s = heappop(next)
+        if d_s > d[s]:
+            continue
+        for (pred, alpha) in mdp.alpha_predecessors(s):
+            if d_s + mdp.w(alpha) < d[pred]:
+                d[pred] = d_s + mdp.w(alpha)
+                heappush(next, (d[pred], pred))
+    return d
 
 
 def pr_max_1(mdp: MDP, T: List[int], connected: List[bool]=[]) -> List[int]:
     """
     Compute the states s of the MDP such that the maximum probability to reach T from s is 1.
+    It is computed as a nested fixpoint directly on the MDP, without building any sub-MDP :
+        - the states that are not connected to T are removed, and the removals are propagated backward : an action
+          is disabled as soon as one of its successors is removed, and a state is removed as soon as all its actions
+          are disabled. Each removed state and each disabled action is handled once, thanks to a disabled actions
+          counter per state.
+        - the states that are not connected anymore to T through the enabled actions of the remaining states are
+          removed in turn, until every remaining state is connected to T. To find them, each remaining state keeps a
+          witness (α, s'), i.e., an enabled action α and an α-successor s' through which it is connected to T, found
+          by a backward breadth-first search from T. When a removal disables the witness of a state, only the states
+          whose witnesses lead to it are searched again, from the remaining states connected to T around them.
 
     :param mdp: a MDP.
     :param T: a target states list of the MDP.
@@ -210,47 +405,98 @@ def pr_max_1(mdp: MDP, T: List[int], connected: List[bool]=[]) -> List[int]:
     """
     if not connected:
         connected = connected_to(mdp, T)
+    states = range(mdp.number_of_states)
     removed_state = [False] * mdp.number_of_states
     T_set = set(T)
-    disabled_action = [[False] * len(mdp.act(s))
-                       for s in range(mdp.number_of_states)]
+    disabled_action = [set() for _ in states]
     no_disabled_actions = [0] * mdp.number_of_states
+    number_of_actions = [mdp.number_of_enabled_actions(s) for s in states]
+    # predecessors index of the MDP, as lists (faster to index from python than arrays)
+    offsets, pred_states, pred_actions = (array.tolist() for array in mdp.predecessor_arrays())
+    # the witness (α, s') of a reached state s is (witness_action[s], witness_successor[s])
+    witness_action = [-1] * mdp.number_of_states
+    witness_successor = [-1] * mdp.number_of_states
+    reached = [False] * mdp.number_of_states
+
+    def search(next: deque) -> None:
+        # backward breadth-first search through the enabled actions of the remaining states not reached yet
+        while len(next) > 0:
+            u = next.pop()
+            for i in range(offsets[u], offsets[u + 1]):
+                t, alpha = pred_states[i], pred_actions[i]
+                if not reached[t] and not removed_state[t] and alpha not in disabled_action[t]:
+                    reached[t] = True
+                    witness_action[t] = alpha
+                    witness_successor[t] = u
+                    next.appendleft(t)
 
-    U = [s for s in range(mdp.number_of_states) if not connected[s]]
+    for t in T:
+        reached[t] = True
+    U = [s for s in states if not connected[s]]
+    for u in U:
+        removed_state[u] = True
+    search(deque(T))
     while len(U) > 0:
+        # propagate the removal of the states of U, and collect the states whose witness is not valid anymore
+        invalid = []
         R = deque(U)
         while len(R) > 0:
             u = R.pop()
-            for (t, alpha_i) in mdp._alpha_pred[u]:
-                if connected[t] and not disabled_action[t][alpha_i] and t not in T_set:
-                    disabled_action[t][alpha_i] = True
+            if reached[u]:
+                reached[u] = False
+                invalid.append(u)
+            for i in range(offsets[u], offsets[u + 1]):
+                t, alpha = pred_states[i], pred_actions[i]
+                if not removed_state[t] and t not in T_set and alpha not in disabled_action[t]:
+                    disabled_action[t].add(alpha)
                     no_disabled_actions[t] += 1
-                    if no_disabled_actions[t] == len(mdp.act(t)):
+                    if no_disabled_actions[t] == number_of_actions[t]:
+                        removed_state[t] = True
                         R.appendleft(t)
-                        connected[t] = False
+                    elif reached[t] and witness_action[t] == alpha:
+                        reached[t] = False
+                        invalid.append(t)
+        # the states whose witnesses lead to an invalid state are not known to be connected to T anymore
+        affected = []
+        while len(invalid) > 0:
+            u = invalid.pop()
+            if not removed_state[u]:
+                affected.append(u)
+            for i in range(offsets[u], offsets[u + 1]):
+                t = pred_states[i]
+                if reached[t] and witness_successor[t] == u:
+                    reached[t] = False
+                    invalid.append(t)
+        # search them again from their successors that are still connected to T
+        frontier = deque()
+        for t in affected:
+            if not reached[t]:
+                for (alpha, succ_list) in mdp.alpha_successors(t):
+                    if alpha not in disabled_action[t]:
+                        succ = next((succ for (succ, _) in succ_list if reached[succ]), None)
+                        if succ is not None:
+                            reached[t] = True
+                            witness_action[t] = alpha
+                            witness_successor[t] = succ
+                            frontier.appendleft(t)
+                            break
+        search(frontier)
+        U = [t for t in affected if not reached[t] and not removed_state[t]]
+        for u in U:
             removed_state[u] = True
-        sub_mdp = MDP([], [], [], number_of_states=mdp.number_of_states, validation=False)
-        for s in range(mdp.number_of_states):
-            if not removed_state[s]:
-                for alpha_i in range(len(mdp.act(s))):
-                    if not disabled_action[s][alpha_i]:
-                        sub_mdp.enable_action(s, mdp._enabled_actions[s][0][alpha_i],
-                                              filter(lambda succ_pr: not removed_state[succ_pr[0]],
-                                                     mdp._enabled_actions[s][1][alpha_i]))
-        mdp = sub_mdp
-        connected = connected_to(mdp, T)
-        U = [s for s in range(mdp.number_of_states)
-             if not connected[s] and not removed_state[s]]
-    pr_1 = [s for s in range(mdp.number_of_states) if not removed_state[s]]
+    pr_1 = [s for s in states if not removed_state[s]]
     return pr_1
 
 
 if __name__ == '__main__':
     from io_utils import graphviz, yaml_parser
 
-    with open(sys.argv[1], 'r') as stream:
+    argv, options = graphviz.parse_options(sys.argv)
+    with open(argv[1], 'r') as stream:
         mdp = yaml_parser.import_from_yaml(stream)
-        T = [mdp.state_index(t) for t in sys.argv[2:]]
+        T = mdp.state_indices(argv[2:])
+        if 'states' in options:
+            options['states'] = mdp.state_indices(options['states'])
         strategy = build_strategy(mdp, T, msg=1)
         strategy_actions = [strategy(s) for s in range(mdp.number_of_states)]
-        graphviz.export_mdp(mdp, sys.argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions)
+        graphviz.export_mdp(mdp, argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions, **options)
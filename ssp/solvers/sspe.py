@@ -18,6 +18,7 @@ Usage:
                          (if the option --from is not provided).
         --from <s>: considered only if the option --threshold is provided. Decides if it is possible to reach the
                     target states from the state <s>  with a length expectation <= l.
+        the plot options --mode, --around, --k, --max-nodes and --no-view (@see io_utils.graphviz.parse_options).
 
         examples :
         $ python3 sspe.py mdp3.yaml --from s0 --threshold 10 s5 s7
@@ -31,28 +32,50 @@ import sys
 myPath = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, myPath + '/../')
 
-from solvers import print_optimal_solution
+from solvers import print_optimal_solution, linear_programming
 from solvers.reachability import pr_max_1
-from structures.mdp import MDP
-from typing import List, Callable
+from solvers.decomposition import strongly_connected_components, is_trivial, iterate_component, SMALL_COMPONENT
+from structures.mdp import MDP, CompactMDP, SubMDP
+from typing import List, Callable, Tuple
+from collections import deque
 from numpy import argmin
+from scipy.sparse.linalg import spsolve
+import numpy as np
+import scipy.sparse
 
 v: List[float]
 """Last optimal solution.
 """
 
 
-def min_expected_cost(mdp: MDP, T: List[int], msg=0, solver: pulp = pulp.GLPK_CMD()) -> List[float]:
+def min_expected_cost(mdp: MDP, T: List[int], msg=0, solver: pulp = pulp.GLPK_CMD(),
+                      method: str = 'lp', epsilon: float = 1e-8) -> List[float]:
     """
     Compute the minimum expected length of paths to the set of targets T from each state in the MDP.
 
     :param mdp: a MDP.
     :param T: a list of target states of the MDP.
     :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
-    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX).
+    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX), or 'highs' to solve the linear program
+                   in-process with scipy (@see solvers.linear_programming).
+    :param method: (optional) 'lp' (default) to compute the expected lengths with a linear program, 'pi' to compute
+                   them with policy iteration (@see policy_iteration) or 'topological' to compute them SCC by SCC
+                   (@see topological_value_iteration).
+    :param epsilon: (optional) convergence threshold of the value iteration (only used if method is 'topological').
     :return: a list x such that x[s] is the mimum expected length of paths to the set of targets T from the state s of
              the MDP.
     """
+    if method not in ('lp', 'pi', 'topological'):
+        raise ValueError("Unknown method '%s' (available methods : 'lp', 'pi', 'topological')." % method)
+    if method in ('pi', 'topological'):
+        if method == 'pi':
+            x, _ = policy_iteration(mdp, T, msg=msg)
+        else:
+            x = topological_value_iteration(mdp, T, epsilon=epsilon, msg=msg)
+        if msg:
+            print_optimal_solution(x, range(mdp.number_of_states), mdp.state_name)
+        return x
+
     states = range(mdp.number_of_states)
     x = [float('inf')] * mdp.number_of_states
     expect_inf = [True] * mdp.number_of_states
@@ -64,6 +87,14 @@ def min_expected_cost(mdp: MDP, T: List[int], msg=0, solver: pulp = pulp.GLPK_CM
     for t in T:
         x[t] = 0
 
+    if linear_programming.is_highs(solver):
+        variables = list(filter(lambda s: x[s] == -1, states))
+        if variables:
+            x = linear_programming.min_expected_cost_lp(mdp, x, variables, expect_inf, msg=msg)
+        if msg:
+            print_optimal_solution(x, states, mdp.state_name)
+        return x
+
     # formulate the LP problem
     linear_program = pulp.LpProblem("minimum expected length of path to target", pulp.LpMaximize)
     # initialize variables
@@ -95,18 +126,184 @@ def min_expected_cost(mdp: MDP, T: List[int], msg=0, solver: pulp = pulp.GLPK_CM
     return x
 
 
-def build_strategy(mdp: MDP, T: List[int], solver: pulp = pulp.GLPK_CMD(), msg=0) -> Callable[[int], int]:
+def policy_iteration(mdp: MDP, T: List[int], msg=0) -> Tuple[List[float], List[int]]:
+    """
+    Compute the minimum expected length of paths to the set of targets T from each state in the MDP and a strategy
+    that achieves it by policy iteration.
+    The iteration starts from a proper strategy (i.e., a strategy reaching T with probability 1) on the states from
+    which T is reachable with probability 1, only considering the actions whose successors are all in these states.
+    Each round evaluates the current strategy with one sparse linear solve, and then improves it greedily. The
+    iteration stops when the strategy is not improved anymore.
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: a tuple (x, strategy) where x[s] is the minimum expected length of paths to T from the state s and
+             strategy[s] is the action chosen in s by the optimal strategy (the first action of s if x[s] is 0 or inf).
+    """
+    compact = CompactMDP.from_mdp(mdp)
+    n = compact.number_of_states
+    T_set = set(T)
+    finite = np.zeros(n, dtype=bool)
+    finite[pr_max_1(mdp, T)] = True
+    # the choices of the states for which x[s] != inf whose successors are all such that x[s'] != inf
+    choice_states = compact.choice_states
+    allowed = finite[choice_states] & \
+        np.minimum.reduceat(finite[compact.successors], compact.transition_offsets[:-1]).astype(bool)
+
+    # initial proper strategy : a backward breadth-first search from T on the allowed choices.
+    choice = np.full(n, -1, dtype=np.int64)
+    next = deque(T)
+    while len(next) > 0:
+        succ = next.pop()
+        for (pred, alpha) in compact.alpha_predecessors(succ):
+            if choice[pred] == -1 and pred not in T_set:
+                lo, hi = compact.choice_offsets[pred], compact.choice_offsets[pred + 1]
+                c = lo + np.flatnonzero(compact.choice_actions[lo:hi] == alpha)[0]
+                if allowed[c]:
+                    choice[pred] = c
+                    next.appendleft(pred)
+    S = np.flatnonzero(choice != -1)
+
+    # index of the states of S in the linear system, x[t] = 0 for the target states
+    index = np.full(n, -1, dtype=np.int64)
+    index[S] = np.arange(len(S))
+    P = compact.transition_matrix()
+    P_S = P[:, S] if len(S) else None
+    weights = np.array(compact._w, dtype=np.float64)[compact.choice_actions]
+    choices = compact.choices_of(S)
+    choices = choices[allowed[choices]]
+    states_of_choices = index[choice_states[choices]]
+
+    x_S = np.zeros(len(S))
+    iterations = 0
+    while len(S):
+        iterations += 1
+        # policy evaluation : x = w(σ) + P_σ x
+        A = scipy.sparse.identity(len(S), format='csr') - P_S[choice[S]]
+        x_S = np.atleast_1d(spsolve(A.tocsc(), weights[choice[S]]))
+        # policy improvement
+        q = weights[choices] + P_S[choices] @ x_S
+        q_min = np.full(len(S), np.inf)
+        np.minimum.at(q_min, states_of_choices, q)
+        tolerance = 1e-9 * np.maximum(1., np.abs(x_S))
+        improvable = np.flatnonzero(x_S - q_min > tolerance)
+        if len(improvable) == 0:
+            break
+        improving = q <= q_min[states_of_choices] + 1e-12 * np.maximum(1., np.abs(q))
+        improving &= np.isin(states_of_choices, improvable)
+        # keep the first minimal choice of each improvable state
+        first = np.unique(states_of_choices[improving], return_index=True)[1]
+        choice[S[states_of_choices[improving][first]]] = choices[improving][first]
+    if msg:
+        print('Policy iteration : %d rounds.' % iterations)
+
+    x = [float('inf')] * n
+    for t in T:
+        x[t] = 0
+    for (i, s) in enumerate(S.tolist()):
+        x[s] = float(x_S[i])
+    strategy = [int(compact.choice_actions[choice[s]]) if choice[s] != -1
+                else (compact.act(s)[0] if compact.number_of_enabled_actions(s) else None)
+                for s in range(n)]
+    return x, strategy
+
+
+def topological_value_iteration(mdp: MDP, T: List[int], epsilon: float = 1e-8, msg=0) -> List[float]:
+    """
+    Compute the minimum expected length of paths to the set of targets T from each state in the MDP, SCC by SCC
+    (@see solvers.decomposition.strongly_connected_components).
+    Only the states from which T is reachable with probability 1 and the actions whose successors are all such states
+    are considered. The SCCs of these states are solved in reverse topological order, the values of the states of the
+    already solved SCCs being constants. A trivial SCC (a single state without self-loop) is solved by one Bellman
+    update, the other ones by value iteration from 0 : x[s] = min_{α} w(α) + Σ_{s'} ∆(s, α, s') x[s'] (state by state
+    for the small ones).
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param epsilon: (optional) the iteration of a SCC stops when the greatest change of a value x[s] during an
+                    iteration is <= epsilon * max(1, x[s]).
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: a list x such that x[s] is the minimum expected length of paths to the set of targets T from the state s.
+    """
+    n = mdp.number_of_states
+    T_set = set(T)
+    finite = [False] * n
+    for s in pr_max_1(mdp, T):
+        finite[s] = True
+    x = [0 if finite[s] else float('inf') for s in range(n)]
+    untreated_states = [s for s in range(n) if finite[s] and s not in T_set]
+    # the actions whose successors all have a finite expected length, i.e., the choices of the finite states' sub-MDP
+    finite_mdp = SubMDP(mdp, states=finite)
+
+    compact = None
+    values = np.array(x, dtype=np.float64)
+    components = strongly_connected_components(finite_mdp, untreated_states)
+    trivial = 0
+    for component in components:
+        if is_trivial(finite_mdp, component):
+            trivial += 1
+            s = component[0]
+            values[s] = min(mdp.w(alpha) + sum(pr * values[succ] for (succ, pr) in succ_list)
+                            for (alpha, succ_list) in finite_mdp.alpha_successors(s))
+        elif len(component) < SMALL_COMPONENT:
+            iterate_component(values, [(s, [(mdp.w(alpha), succ_list)
+                                            for (alpha, succ_list) in finite_mdp.alpha_successors(s)])
+                                       for s in component], min, epsilon,
+                              lambda new_value, value: abs(new_value - value) / max(1., new_value))
+        else:
+            if compact is None:
+                compact = CompactMDP.from_mdp(mdp)
+                finite_array = np.array(finite)
+                allowed_choices = finite_array[compact.choice_states] & \
+                    np.minimum.reduceat(finite_array[compact.successors], compact.transition_offsets[:-1]).astype(bool)
+                P = compact.transition_matrix()
+                weights = np.array(compact._w, dtype=np.float64)[compact.choice_actions]
+                number_of_choices = np.diff(compact.choice_offsets)
+            states = np.array(component)
+            choices = compact.choices_of(states)
+            allowed_of_states = allowed_choices[choices]
+            choices = choices[allowed_of_states]
+            # position of the first allowed choice of each state among the allowed choices of the SCC
+            number_of_allowed = np.add.reduceat(allowed_of_states, np.concatenate(
+                ([0], np.cumsum(number_of_choices[states])[:-1])))
+            first_choices = np.concatenate(([0], np.cumsum(number_of_allowed)[:-1]))
+            P_component = P[choices]
+            weights_component = weights[choices]
+            delta = epsilon + 1
+            while delta > epsilon:
+                new_values = np.minimum.reduceat(weights_component + P_component @ values, first_choices)
+                delta = (np.abs(new_values - values[states]) / np.maximum(1., new_values)).max()
+                values[states] = new_values
+    x = values.tolist()
+    if msg:
+        print('Topological value iteration : %d SCCs (%d trivial).' % (len(components), trivial))
+
+    return x
+
+
+def build_strategy(mdp: MDP, T: List[int], solver: pulp = pulp.GLPK_CMD(), msg=0,
+                   method: str = 'lp') -> Callable[[int], int]:
     """
     Build a memoryless strategy that returns, following a state s of the MDP, the action that minimize
     the expected length of paths to a set of target states T.
 
     :param mdp: a MDP for which the strategy will be built.
     :param T: a target states list.
-    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX).
+    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX), or 'highs' (@see min_expected_cost).
+    :param method: (optional) the method used to compute the minimum expected lengths (@see min_expected_cost).
+                   With policy iteration, the strategy is directly the final strategy of the iteration.
     :return: the strategy built.
     """
-    x = min_expected_cost(mdp, T, solver=solver, msg=msg)
     global v
+    if method == 'pi':
+        x, strategy = policy_iteration(mdp, T, msg=msg)
+        if msg:
+            print_optimal_solution(x, range(mdp.number_of_states), mdp.state_name)
+        v = x
+        return lambda s: strategy[s]
+
+    x = min_expected_cost(mdp, T, solver=solver, msg=msg, method=method)
     v = x
 
     states = range(mdp.number_of_states)
@@ -125,32 +322,35 @@ def build_strategy(mdp: MDP, T: List[int], solver: pulp = pulp.GLPK_CMD(), msg=0
 if __name__ == '__main__':
     from io_utils import yaml_parser, graphviz
 
-    with open(sys.argv[1], 'r') as stream:
+    argv, options = graphviz.parse_options(sys.argv)
+    with open(argv[1], 'r') as stream:
         mdp = yaml_parser.import_from_yaml(stream)
+        if 'states' in options:
+            options['states'] = mdp.state_indices(options['states'])
         offset = 0
         s = -1
         l = -1
-        if '--threshold' in sys.argv:
-            l = int(sys.argv[sys.argv.index('--threshold') + 1])
+        if '--threshold' in argv:
+            l = int(argv[argv.index('--threshold') + 1])
             offset += 2
-        if '--from' in sys.argv:
-            s = mdp.state_index(sys.argv[sys.argv.index('--from') + 1])
+        if '--from' in argv:
+            s = mdp.state_index(argv[argv.index('--from') + 1])
             offset += 2
-        T = [mdp.state_index(t) for t in sys.argv[(2 + offset):]]
+        T = mdp.state_indices(argv[(2 + offset):])
         strategy = build_strategy(mdp, T, msg=1)
         strategy_actions = [strategy(s) for s in range(mdp.number_of_states)]
         if l != -1 and s == -1:
             if list(filter(lambda s: v[s] > l, range(mdp.number_of_states))):
                 print("There don't exist any strategy that solve the SSPE problem for this MDP from all states to {%s} "
-                      "under the length threshold %d." % (','.join(sys.argv[(2 + offset):]), l))
+                      "under the length threshold %d." % (','.join(argv[(2 + offset):]), l))
             else:
-                graphviz.export_mdp(mdp, sys.argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions)
+                graphviz.export_mdp(mdp, argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions, **options)
         elif l != -1 and s != -1:
             if v[s] > l:
                 print("There don't exist any strategy that solve the SSPE problem for this MDP from the state %s "
-                      "to {%s} under the length threshold %d." % (sys.argv[sys.argv.index('--from') + 1],
-                                                                  ','.join(sys.argv[(2 + offset):]), l))
+                      "to {%s} under the length threshold %d." % (argv[argv.index('--from') + 1],
+                                                                  ','.join(argv[(2 + offset):]), l))
             else:
-                graphviz.export_mdp(mdp, sys.argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions)
+                graphviz.export_mdp(mdp, argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions, **options)
         else:
-            graphviz.export_mdp(mdp, sys.argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions)
+            graphviz.export_mdp(mdp, argv[1].replace('.yaml', '').replace('.yml', ''), strategy_actions, **options)
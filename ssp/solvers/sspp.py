@@ -18,24 +18,106 @@ Usage:
         :l : the paths length threshold
         :b : the probability threshold
         :t1 t2 <...> tn: the target states label of the MDP
+
+    options : the plot options --mode, --around, --k, --max-nodes and --no-view (@see io_utils.graphviz.parse_options).
+                The states of --around are states of the unfolded MDP, e.g., '(s, 2)'.
 """
 
 import pulp
 import os
 import sys
+import weakref
 
 myPath = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, myPath + '/../')
 
+import numpy as np
 import solvers.reachability
-from structures.mdp import MDP, UnfoldedMDP
-from typing import List
+from solvers import print_optimal_solution
+from structures.mdp import MDP, UnfoldedMDP, CompactMDP
+from typing import List, Callable, Iterator, Tuple
 from io_utils import graphviz, yaml_parser
 
 unfolded_mdp_name = 'unfolded_mdp'
 
+_solutions = weakref.WeakKeyDictionary()
+"""Cache of the solutions computed by solve_short_paths_from, per MDP : _solutions[mdp] = (modifications, solutions)
+where solutions are the ones computed since the last modification of the MDP (@see MDP.modifications).
+"""
+
+
+class ShortPathsSolution:
+    """ Solution of the SSPP problem from a state s0 to a set of target states T with a paths length threshold l, that
+    can be used to decide any number of probability thresholds b without solving the problem again.
+
+    Initialisation parameters :
+        :param u_mdp: the MDP unfolded from s0 (None if the solution was computed without unfolding the MDP).
+        :param values: the vector of the optimal solution, i.e., the maximum probabilities to reach T with a path length
+                       <= l, for each state of the unfolded MDP (or for each state of the MDP if u_mdp is None).
+        :param probability: the maximum probability to reach T from s0 with a path length <= l.
+        :param strategy: the strategy that maximises this probability.
+    """
+
+    def __init__(self, u_mdp: UnfoldedMDP, values: List[float], probability: float, strategy: Callable):
+        self.u_mdp = u_mdp
+        self.values = values
+        self.probability = probability
+        self.strategy = strategy
+
+    def satisfies(self, b: float) -> bool:
+        """
+        Decide if there exists a strategy such that the probability to reach T from s0 with a path length <= l is >= b.
 
-def force_short_paths_from(mdp: MDP, s: int, T: List[int], l: int, b: float, msg=0, solver=pulp.GLPK_CMD()):
+        :param b: probability threshold.
+        :return: True iff the SSPP problem can be solved for the probability threshold b.
+        """
+        if not (0. <= b <= 1.):
+            raise ValueError("b must be a probability threshold, i.e., 0 <= b <= 1 (current value : %g)." % b)
+        return self.probability >= b
+
+    def strategy_for(self, b: float) -> Callable:
+        """
+        Get the strategy that solves the SSPP problem for the probability threshold b.
+
+        :param b: probability threshold.
+        :return: the optimal strategy if it solves the SSPP problem for b, None otherwise.
+        """
+        return self.strategy if self.satisfies(b) else None
+
+
+def solve_short_paths_from(mdp: MDP, s: int, T: List[int], l: int, msg=0, solver=pulp.GLPK_CMD(),
+                           method: str = 'lp') -> ShortPathsSolution:
+    """
+    Solve the SSPP problem from the state s of the MDP to T with the paths length threshold l, independently of any
+    probability threshold (@see force_short_paths_from for the parameters).
+    The solutions are cached following (mdp, s, T, l, method, solver) : solving the same problem again only costs a
+    lookup. The cached solutions of a MDP are dropped as soon as it is modified (@see MDP.modifications).
+
+    :return: the solution of the SSPP problem.
+    """
+    if method not in ('lp', 'dp'):
+        raise ValueError("Unknown method '%s' (available methods : 'lp', 'dp')." % method)
+    key = (s, tuple(sorted(set(T))), l, method, solver if method == 'lp' else None)
+    modifications, solutions = _solutions.get(mdp, (None, None))
+    if modifications != mdp.modifications:
+        solutions = {}
+        _solutions[mdp] = (mdp.modifications, solutions)
+    if key not in solutions:
+        if method == 'dp':
+            x, strategy = short_paths_probability(mdp, T, l, msg=msg)
+            solutions[key] = ShortPathsSolution(None, x, x[s], strategy)
+        else:
+            # First, we must define a mdp that record the length of the paths during an execution of the mdp from s
+            # (the states (s', v) that can not reach T with a path length <= l are directly replaced by ⊥)
+            u_mdp = UnfoldedMDP(mdp, s, T, l, d=solvers.reachability.minimal_weight_to(mdp, T))
+            strategy = solvers.reachability.build_strategy(u_mdp, u_mdp.target_states, msg=msg, solver=solver)
+            x = solvers.reachability.v
+            solutions[key] = ShortPathsSolution(u_mdp, x, x[0], strategy)
+    return solutions[key]
+
+
+def force_short_paths_from(mdp: MDP, s: int, T: List[int], l: int, b: float, msg=0, solver=pulp.GLPK_CMD(),
+                           method: str = 'lp'):
     """
     Compute the maximum probability to reach a set of target states T from a state s of a MDP with a path length
     inferior than a threshold l and get the strategy on the unfolded mdp.
@@ -46,32 +128,225 @@ def force_short_paths_from(mdp: MDP, s: int, T: List[int], l: int, b: float, msg
     :param l: the paths length threshold.
     :param b: probability threshold.
     :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
-    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX).
+    :param solver: (optional) a LP solver allowed in puLp (e.g., GLPK or CPLEX), or 'highs' to solve the linear program
+                   in-process with scipy (@see solvers.linear_programming).
+    :param method: (optional) 'lp' (default) to solve the reachability problem on the unfolded MDP with a linear
+                   program, or 'dp' to compute the probabilities by a backward sweep on the path lengths
+                   (@see short_paths_probability). In the latter case, no unfolded MDP is built : the first element
+                   of the returned tuple is None and the strategy is counter-based, i.e., it takes as parameters a
+                   state s of the MDP and the current path length v.
     :return: the unfolded MDP from s and the strategy that solve the reachability problem for the unfolded MDP from s.
              Note that the strategy uses the index of states of the unfolded MDP and not the (s, v) format.
+             The problem is only solved once for any number of probability thresholds b
+             (@see solve_short_paths_from).
+    """
+    if not (0. <= b <= 1.):
+        raise ValueError("b must be a probability threshold, i.e., 0 <= b <= 1 (current value : %g)." % b)
+    solution = solve_short_paths_from(mdp, s, T, l, msg=msg, solver=solver, method=method)
+    return solution.u_mdp, solution.strategy_for(b)
+
+
+def short_paths_probability(mdp: MDP, T: List[int], l: int, msg=0,
+                            with_strategy=True) -> Tuple[List[float], Callable[[int, int], int]]:
+    """
+    Compute the maximum probability to reach T from each state of the MDP with a path length inferior than l, and a
+    counter-based strategy that achieves it.
+    Let Pr(s, v) be the maximum probability to reach T from s when the current path length is v. Since the weights
+    are strictly positive, Pr(s, v) only depends on the values Pr(s', v') such that v < v' <= l. These values are thus
+    computed layer by layer in one backward sweep from v = l down to 0 (@see length_layers), without unfolding the MDP.
+    Only the last max_α w(α) layers of values are kept in memory. However, the counter-based strategy chooses an action
+    for each pair (s, v), so that extracting it stores (l + 1) x (number of states) actions : set with_strategy to
+    False to only compute the probabilities.
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param l: the paths length threshold.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :param with_strategy: (optional) set this parameter to False to not extract the strategy.
+    :return: a tuple (x, strategy) where x[s] = Pr(s, 0) and strategy(s, v) is the action that maximises Pr(s, v)
+             (None if s ∈ T, v > l or s has no enabled action), strategy being None if with_strategy is False.
+    """
+    actions = np.empty((l + 1, mdp.number_of_states), dtype=np.int32) if with_strategy else None
+    for (r, values, layer_actions) in length_layers(mdp, T):
+        if with_strategy:
+            actions[r] = layer_actions
+        if r == l:
+            break
+    x = values.tolist()
+
+    if msg:
+        print_optimal_solution(x, list(range(mdp.number_of_states)), mdp.state_name)
+
+    return x, _counter_strategy(actions, l) if with_strategy else None
+
+
+def quantile(mdp: MDP, s: int, T: List[int], b: float, l_max: int = None, epsilon: float = 1e-12,
+             msg=0) -> Tuple[int, Callable[[int, int], int]]:
+    """
+    Compute the minimal paths length threshold l such that there exists a strategy for which the probability to reach
+    T from s with a path length inferior than l is >= b.
+    The length threshold is increased one step at a time, each step only computing one new layer from the previous
+    ones (@see length_layers). The layers are the probabilities not to reach T, so that a probability that only tends
+    to 1 (e.g., in a geometric MDP) is never rounded to 1 : the threshold b is met iff the probability not to reach T
+    from s is <= (1 - b)(1 + epsilon), i.e., up to the relative rounding errors of the layers.
+    The search stops as soon as the probability threshold is met, or when the layers have become stationary, i.e.,
+    when no probability changes by more than epsilon over max_α w(α) + 1 consecutive layers, or when l_max is reached.
+    Without l_max, the number of layers computed is thus only bounded by the convergence of the probabilities (e.g.,
+    about log2(1 / epsilon) layers for a geometric MDP of parameter 1/2), and a threshold b that is only met after the
+    probabilities increase by less than epsilon per layer is not found (epsilon = 0 only stops on exactly equal
+    layers). With l_max, at most l_max + 1 layers are computed.
+
+    :param mdp: a MDP.
+    :param s: the initial state.
+    :param T: a list of target states of the MDP.
+    :param b: probability threshold.
+    :param l_max: (optional) maximum length threshold to consider.
+    :param epsilon: (optional) tolerance of the comparison with b and of the stationarity of the layers.
+    :param msg: (optional) set this parameter to 1 to activate the debug mode in the console.
+    :return: a tuple (l, strategy) where l is the minimal length threshold and strategy(s, v) the counter-based
+             strategy that solves the SSPP problem for l (@see short_paths_probability), or (None, None) if no such
+             threshold exists (or if it is > l_max).
     """
     if not (0. <= b <= 1.):
-        raise ValueError("alpha must be a probability threshold, i.e., 0 <= alpha <= 1 (current value : %g)." % alpha)
-    # First, we must define a mdp that record the length of the paths during an execution of the mdp from s
-    u_mdp = UnfoldedMDP(mdp, s, T, l)
-    strategy = solvers.reachability.build_strategy(u_mdp, u_mdp.target_states, msg=msg, solver=solver)
-    if solvers.reachability.v[0] >= b:
-        return u_mdp, strategy
-    else:
-        return u_mdp, None
+        raise ValueError("b must be a probability threshold, i.e., 0 <= b <= 1 (current value : %g)." % b)
+    # the layers are stationary as soon as span + 1 consecutive layers are equal up to epsilon
+    span = max([mdp.w(alpha) for alpha in range(mdp.number_of_actions)], default=1)
+    actions = []
+    unchanged = 0
+    previous = None
+    for (l, y, layer_actions) in length_layers(mdp, T, complement=True):
+        actions.append(layer_actions)
+        if y[s] <= (1. - b) * (1. + epsilon):
+            if msg:
+                print('Minimal length threshold : %d (probability %g).' % (l, 1. - y[s]))
+            return l, _counter_strategy(actions, l)
+        unchanged = unchanged + 1 if previous is not None and np.max(previous - y, initial=0.) <= epsilon else 0
+        if unchanged >= span or (l_max is not None and l >= l_max):
+            break
+        previous = y
+    if msg:
+        print('The probability threshold %g can not be reached (maximum probability %g).' % (b, 1. - y[s]))
+    return None, None
+
+
+def _counter_strategy(actions, l: int) -> Callable[[int, int], int]:
+    # actions[r][s] is the action chosen in s when the remaining length is r (-1 if there is no action to choose)
+    def strategy(s: int, v: int) -> int:
+        if v > l or actions[l - v][s] == -1:
+            return None
+        return int(actions[l - v][s])
+
+    return strategy
+
+
+def short_paths_table(mdp: MDP, T: List[int], l: int) -> np.ndarray:
+    """
+    Compute in one sweep the maximum probability to reach T with a path length inferior than v from each state s of
+    the MDP, for each length threshold v <= l (@see length_layers).
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param l: the maximum paths length threshold.
+    :return: an array table of shape (l + 1, number of states) such that table[v][s] is the maximum probability to
+             reach T from s with a path length <= v.
+    """
+    table = np.empty((l + 1, mdp.number_of_states))
+    for (v, x, _) in length_layers(mdp, T):
+        table[v] = x
+        if v == l:
+            break
+    return table
+
+
+def force_short_paths(mdp: MDP, T: List[int], l: int, b: float) -> List[bool]:
+    """
+    Decide for each state s of the MDP if there exists a strategy such that the probability to reach T from s with a
+    path length inferior than l is >= b. All the states are decided in one sweep on the layers up to l (@see
+    length_layers), where only the last max_α w(α) layers are kept in memory.
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param l: the paths length threshold.
+    :param b: probability threshold.
+    :return: a list decision such that decision[s] is True iff the SSPP problem can be solved from s.
+    """
+    if not (0. <= b <= 1.):
+        raise ValueError("b must be a probability threshold, i.e., 0 <= b <= 1 (current value : %g)." % b)
+    for (r, x, _) in length_layers(mdp, T):
+        if r == l:
+            return (x >= b).tolist()
+
+
+def length_layers(mdp: MDP, T: List[int], complement=False) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Get an iterator on the layers of the maximum probabilities to reach T with bounded path lengths.
+    The r th layer is the tuple (r, x_r, actions_r) where
+        - x_r[s] is the maximum probability to reach T from s with a path length <= r, i.e., x_r[s] = Pr(s, l - r)
+          for any length threshold l >= r,
+        - actions_r[s] is an action maximising x_r[s] (-1 if s ∈ T or s has no enabled action).
+    Indeed, x_r[t] = 1 for each t ∈ T and x_r[s] = max_{α ∈ A(s)} Σ_{s'} ∆(s, α, s') x_{r - w(α)}[s'] for the other
+    states, where x_{r'} = 0 if r' < 0. Each layer is computed from the max_α w(α) previous ones with one sparse
+    matrix-vector product per action weight.
+
+    :param mdp: a MDP.
+    :param T: a list of target states of the MDP.
+    :param complement: (optional) set this parameter to True to get the layers 1 - x_r instead, i.e., the minimum
+                       probabilities not to reach T with a path length <= r. They are computed directly, so that the
+                       probabilities x_r[s] close to 1 are not rounded to 1.
+    :return: an (infinite) iterator on the layers (r, x_r, actions_r) for r = 0, 1, 2, ...
+    """
+    compact = CompactMDP.from_mdp(mdp)
+    n = compact.number_of_states
+    P = compact.transition_matrix()
+    choice_weights = np.array(compact._w, dtype=np.int64)[compact.choice_actions]
+    # the choices of each action weight and their transition matrix
+    groups = [(weight, np.flatnonzero(choice_weights == weight)) for weight in np.unique(choice_weights).tolist()]
+    groups = [(weight, choices, P[choices]) for (weight, choices) in groups]
+    span = max([weight for (weight, _, _) in groups], default=1)
+
+    with_choices = np.flatnonzero(np.diff(compact.choice_offsets))
+    first_choices = compact.choice_offsets[with_choices]
+    choice_index = np.arange(compact.number_of_choices)
+    # the value of x_{r'}[s] for r' < 0 and for the states without any enabled action
+    outside = 1. if complement else 0.
+    optimum = np.minimum if complement else np.maximum
+    # layers[r % span] is the r th layer
+    layers = [None] * span
+    r = 0
+    while True:
+        q = np.full(compact.number_of_choices, outside)
+        for (weight, choices, P_weight) in groups:
+            if r >= weight:
+                q[choices] = P_weight @ layers[(r - weight) % span]
+        x = np.full(n, outside)
+        actions = np.full(n, -1, dtype=np.int32)
+        if len(with_choices):
+            x[with_choices] = optimum.reduceat(q, first_choices)
+            # the first choice of each state that reaches the maximum
+            best = np.where(q == np.repeat(x[with_choices], np.diff(compact.choice_offsets)[with_choices]),
+                            choice_index, compact.number_of_choices)
+            actions[with_choices] = compact.choice_actions[np.minimum.reduceat(best, first_choices)]
+        x[T] = 1. - outside
+        actions[T] = -1
+        layers[r % span] = x
+        yield r, x, actions
+        r += 1
 
 
 if __name__ == '__main__':
-    with open(sys.argv[1], 'r') as stream:
+    argv, options = graphviz.parse_options(sys.argv)
+    with open(argv[1], 'r') as stream:
         mdp = yaml_parser.import_from_yaml(stream)
-        s0 = int(mdp.state_index(sys.argv[2]))
-        l = int(sys.argv[3])
-        b = float(sys.argv[4])
-        T = [mdp.state_index(t) for t in sys.argv[5:]]
+        s0 = int(mdp.state_index(argv[2]))
+        l = int(argv[3])
+        b = float(argv[4])
+        T = mdp.state_indices(argv[5:])
         u_mdp, strategy = force_short_paths_from(mdp, s0, T, l, b, msg=1)
         if not strategy:
             print("There don't exist any strategy that solve the SSPP problem for this MDP from the state %s to {%s} "
-                  "and the probability threshold %g." % (sys.argv[2], ", ".join(sys.argv[5:]), b))
+                  "and the probability threshold %g." % (argv[2], ", ".join(argv[5:]), b))
         else:
-            graphviz.export_mdp(u_mdp, sys.argv[1].replace('.yaml', '').replace('.yml', ''),
-                                [strategy(s) for s in range(u_mdp.number_of_states)])
+            # the states of the plot options are states of the unfolded MDP, (s0, 0) by default
+            options['states'] = u_mdp.state_indices(options['states']) if 'states' in options else [0]
+            graphviz.export_mdp(u_mdp, argv[1].replace('.yaml', '').replace('.yml', ''),
+                                [strategy(s) for s in range(u_mdp.number_of_states)], **options)
@@ -3,9 +3,18 @@
 This module contains MDP structures implementations as class.
 """
 from functools import reduce
-from typing import Tuple, List, Set, Iterable, Iterator
+from bisect import bisect_right
+from collections import deque
+from typing import Tuple, List, Set, Iterable, Iterator, Callable, Dict
 
-from structures.util import ReadOnlyList, Bot
+import numpy as np
+from scipy import sparse
+
+from structures.util import Bot, ReadOnlyList, paused_gc, concatenated_ranges
+
+_TOMBSTONE = -1
+"""Action stored in the slot of a disabled action, in the mutable mode of a MDP (@see MDP.set_mutable).
+"""
 
 
 class MDP:
@@ -13,7 +22,7 @@ class MDP:
     It stores actions and α-successors in a successors list following this way :
     Let s be the s th state of the MDP,
 
-    List[ Tuple[ List[int], List[Tuple[int, int]] ]
+    List[ Tuple[ List[int], List[Tuple[Tuple[int, float], ...]] ]
         ...
        ╎   ╎        ┌───┐  ┌─────────────────────┬─────────────────────┬┄┄┄┄┄┄
        ┣━━━┫        │α1 │  │(s'1, ∆(s, α1, s'1)) │(s'2, ∆(s, α1, s'2)) │   ...
@@ -24,7 +33,9 @@ class MDP:
         ...          ...
     where α1, α2, ... are the enabled actions for s.
     Note that it is possible to iterate on the alpha-successors of s calling the function alpha_successors(s) that
-    associates each action alpha with its alpha-successors list.
+    associates each action alpha with its alpha-successors list. The α-successors lists are stored as tuples, so that
+    they are given as they are (without any copy) by alpha_successors and choices.
+    The algorithms that prune a MDP in place should switch it to the mutable mode first (@see set_mutable).
 
     Initialisation parameters :
         :param states: A list containing the states' names. If it is empty, the name of the s th state is
@@ -42,6 +53,11 @@ class MDP:
                            speed can be improved), but this can provoke some errors if misused.
     """
 
+    # slots of the enabled actions of each state in the mutable mode (@see set_mutable), None out of this mode.
+    _slots: List[Dict[int, int]] = None
+    # number of modifications of the transitions of this MDP (@see modifications).
+    _modifications = 0
+
     def __init__(self, states: List[str], actions: List[str], w: List[int],
                  number_of_states: int = -1, validation=True):
         self._states_name = states
@@ -58,10 +74,105 @@ class MDP:
                 raise ValueError('The weights list is empty.')
         self._enabled_actions: List[Tuple[List[int], List[List[Tuple[int, float]]]]] = \
             [([], []) for _ in range(number_of_states)]
-        self._pred: List[Set[int]] = \
-            [set() for _ in range(number_of_states)]
-        self._alpha_pred: List[List[Tuple[int, int]]] = \
-            [[] for _ in range(number_of_states)]
+        # the predecessors of each state are only computed on demand (see _build_predecessors).
+        self._pred_offsets = None
+        self._pred_states = None
+        self._pred_actions = None
+
+    @staticmethod
+    def from_arrays(states: List[str], actions: List[str], w: List[int], sources: Iterable[int],
+                    alphas: Iterable[int], successors: Iterable[int], probabilities: Iterable[float],
+                    number_of_states: int = -1, validation=True) -> 'MDP':
+        """
+        Build a MDP at once from the columns of its transitions : the i th transition is
+        ∆(sources[i], alphas[i], successors[i]) = probabilities[i].
+        The transitions of a same pair (s, α) form the α-successors of s and the actions of each state s are enabled
+        following their first occurrence in the columns. All the distributions are checked at once (if validation is
+        True) and every offending transition or pair (s, α) is reported in a single ValueError.
+
+        :param states: A list containing the states' names (see MDP).
+        :param actions: A list containing the actions' names (see MDP).
+        :param w: List of action's weight.
+        :param sources: the source state s of each transition.
+        :param alphas: the action α of each transition.
+        :param successors: the α-successor s' of each transition.
+        :param probabilities: the probability ∆(s, α, s') of each transition.
+        :param number_of_states: (optional) Number of states in the MDP (see MDP). If it is not provided and the list of
+                                 states' names is empty, it is the greatest state index in the columns + 1.
+        :param validation: (optional) @see MDP.
+        :return: the MDP built from the columns in parameter.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        alphas = np.asarray(alphas, dtype=np.int64)
+        successors = np.asarray(successors, dtype=np.int64)
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if number_of_states < 0 and not states and len(sources):
+            number_of_states = int(max(sources.max(), successors.max())) + 1
+        with paused_gc():
+            mdp = MDP(states, actions, w, number_of_states, validation=validation)
+        n = mdp.number_of_states
+        number_of_actions = mdp.number_of_actions
+        if validation:
+            if not (len(sources) == len(alphas) == len(successors) == len(probabilities)):
+                raise ValueError('The columns of the transitions must have the same length.')
+            errors = []
+            for (name, column, bound) in (('states', sources, n), ('actions', alphas, number_of_actions),
+                                          ('successors', successors, n)):
+                wrong = np.flatnonzero((column < 0) | (column >= bound))
+                if len(wrong):
+                    errors.append('The following %s are not indexes of %s of this MDP: %s.'
+                                  % (name, 'actions' if name == 'actions' else 'states',
+                                     str(sorted(set(column[wrong].tolist())))))
+            if errors:
+                raise ValueError('\n'.join(errors))
+
+        # the choices (s, α) are sorted by state, then by first occurrence in the columns
+        keys, first, inverse = np.unique(sources * number_of_actions + alphas, return_index=True, return_inverse=True)
+        order = np.lexsort((first, keys // number_of_actions))
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        transition_choices = rank[inverse.reshape(-1)]
+        choice_states = (keys // number_of_actions)[order]
+        choice_actions = (keys % number_of_actions)[order]
+
+        if validation:
+            errors = []
+            wrong = np.flatnonzero(~((0 < probabilities) & (probabilities <= 1)))
+            if len(wrong):
+                errors.append("These following transitions (s, α, s', ∆(s, α, s')) do not respect "
+                              "0 < ∆(s, α, s') <= 1: " +
+                              str([(mdp.state_name(s), mdp.act_name(alpha), mdp.state_name(succ), pr)
+                                   for (s, alpha, succ, pr) in zip(sources[wrong].tolist(), alphas[wrong].tolist(),
+                                                                   successors[wrong].tolist(),
+                                                                   probabilities[wrong].tolist())]) + '.')
+            sums = np.bincount(transition_choices, weights=probabilities, minlength=len(order))
+            wrong = np.flatnonzero(np.round(sums, 12) != 1)
+            if len(wrong):
+                errors.append('The transition functions formed by the α-successors of the following pairs '
+                              '(s, α, Σ ∆(s, α, s\')) are not distribution functions on the states of this MDP: ' +
+                              str([(mdp.state_name(s), mdp.act_name(alpha), pr_sum)
+                                   for (s, alpha, pr_sum) in zip(choice_states[wrong].tolist(),
+                                                                 choice_actions[wrong].tolist(),
+                                                                 sums[wrong].tolist())]) + '.')
+            if errors:
+                raise ValueError('\n'.join(errors))
+
+        # fill the α-successors of each state by slicing the sorted columns, and the predecessors index at once
+        transition_order = np.argsort(transition_choices, kind='stable')
+        transition_offsets = np.concatenate(([0], np.cumsum(np.bincount(transition_choices, minlength=len(order)))))
+        choice_offsets = np.concatenate(([0], np.cumsum(np.bincount(choice_states, minlength=n))))
+        sorted_successors = successors[transition_order].tolist()
+        sorted_probabilities = probabilities[transition_order].tolist()
+        transition_offsets = transition_offsets.tolist()
+        choice_actions = choice_actions.tolist()
+        with paused_gc():
+            alpha_successors = [tuple(zip(sorted_successors[lo:hi], sorted_probabilities[lo:hi]))
+                                for (lo, hi) in zip(transition_offsets, transition_offsets[1:])]
+            for s in range(n):
+                lo, hi = choice_offsets[s], choice_offsets[s + 1]
+                mdp._enabled_actions[s] = (choice_actions[lo:hi], alpha_successors[lo:hi])
+        mdp._set_predecessors(sources, alphas, successors)
+        return mdp
 
     def enable_action(self, s: int, alpha: int,
                       delta_s_alpha: Iterable[Tuple[int, float]]) -> None:
@@ -96,13 +207,22 @@ class MDP:
     def _enable_action(self, s: int, alpha: int,
                        delta_s_alpha: Iterable[Tuple[int, float]]) -> None:
         act_s, alpha_succ = self._enabled_actions[s]
+        succ_list = tuple((succ, pr) for (succ, pr) in delta_s_alpha)
+        self._modifications += 1
+        if self._slots is None:
+            self._pred_offsets = None
+        else:
+            if alpha in self._slots[s]:
+                raise ValueError('The action %s is already enabled for the state %s.'
+                                 % (self.act_name(alpha), self.state_name(s)))
+            slot = self._slots[s][alpha] = len(act_s)
+            # the predecessors index is completed instead of being rebuilt
+            for (succ, _) in succ_list:
+                self._pred_counts[succ] += 1
+                self._pred_extra.setdefault(succ, []).append((s, alpha, slot))
+            self._pred_stale = True
         act_s.append(alpha)
-        i = len(alpha_succ)
-        alpha_succ.append([])
-        for (succ, pr) in delta_s_alpha:
-            alpha_succ[i].append((succ, pr))
-            self._pred[succ].add(s)
-            self._alpha_pred[succ].append((s, len(act_s) - 1))
+        alpha_succ.append(succ_list)
 
     def disable_action(self, s: int, alpha: int) -> None:
         """
@@ -111,18 +231,129 @@ class MDP:
         :param s: a state of this MDP.
         :param alpha: an action enabled for s.
         """
-        i = self.act(s).index(alpha)
-        del self._enabled_actions[s][0][i]
-        del self._enabled_actions[s][1][i]
+        if self._slots is None:
+            i = self.act(s).index(alpha)
+            del self._enabled_actions[s][0][i]
+            del self._enabled_actions[s][1][i]
+            self._pred_offsets = None
+            self._modifications += 1
+            return
+        slot = self._slots[s].pop(alpha, None)
+        if slot is None:
+            raise ValueError('The action %s is not enabled for the state %s.'
+                             % (self.act_name(alpha), self.state_name(s)))
+        self._modifications += 1
+        act_s, alpha_succ = self._enabled_actions[s]
+        for (succ, _) in alpha_succ[slot]:
+            self._pred_counts[succ] -= 1
+        act_s[slot] = _TOMBSTONE
+        alpha_succ[slot] = ()
+        self._tombstones[s] += 1
+        self._pred_stale = True
+
+    def set_mutable(self, mutable: bool = True) -> None:
+        """
+        Switch this MDP to the mutable mode, made for the algorithms that prune a MDP in place, or leave this mode.
+        In the mutable mode, disable_action does not search nor remove the action from the actions of s : it leaves a
+        tombstone in its slot, found in O(1). Moreover, enable_action and disable_action keep the predecessors of the
+        states (@see alpha_predecessors and number_of_predecessors) up to date, instead of dropping the predecessors
+        index. Thus, both run in O(|SuccPr(s, α)|).
+        The tombstones are removed by compact(), or when leaving the mutable mode. Note that an action can not be
+        enabled twice for the same state in this mode.
+
+        :param mutable: (optional) set this parameter to False to leave the mutable mode.
+        """
+        if not mutable:
+            self.compact()
+            self._slots = None
+            return
+        if self._slots is not None:
+            return
+        slots = [{alpha: i for (i, alpha) in enumerate(act_s)} for (act_s, _) in self._enabled_actions]
+        for (s, (act_s, _)) in enumerate(self._enabled_actions):
+            if len(slots[s]) != len(act_s):
+                raise ValueError('The state %s has an action enabled twice, this MDP can not be switched to the '
+                                 'mutable mode.' % self.state_name(s))
+        self._slots = slots
+        self._tombstones = [0] * self.number_of_states
+        self._build_predecessors()
+
+    @property
+    def modifications(self) -> int:
+        """
+        Get the number of modifications of this MDP (enabled or disabled actions, compactions), e.g., to detect that a
+        result computed on this MDP is out of date.
+
+        :return: the number of modifications of this MDP since its creation.
+        """
+        return self._modifications
+
+    @property
+    def is_mutable(self) -> bool:
+        """
+        Check if this MDP is in the mutable mode (@see set_mutable).
+
+        :return: True iff this MDP is in the mutable mode.
+        """
+        return self._slots is not None
+
+    def compact(self) -> None:
+        """
+        Remove the tombstones left by disable_action in the mutable mode (@see set_mutable), and rebuild the
+        predecessors index accordingly. The remaining actions of each state keep their order.
+        """
+        if self._slots is None:
+            return
+        compacted = False
+        for (s, (act_s, alpha_succ)) in enumerate(self._enabled_actions):
+            if self._tombstones[s]:
+                alpha_succ[:] = [succ_list for (alpha, succ_list) in zip(act_s, alpha_succ) if alpha != _TOMBSTONE]
+                act_s[:] = [alpha for alpha in act_s if alpha != _TOMBSTONE]
+                self._slots[s] = {alpha: i for (i, alpha) in enumerate(act_s)}
+                self._tombstones[s] = 0
+                compacted = True
+        if compacted:
+            self._modifications += 1
+        # the slots of the compacted states are renumbered, so that the slots stored in the predecessors index are wrong
+        if compacted or self._pred_stale:
+            self._build_predecessors()
+
+    def is_enabled(self, s: int, alpha: int) -> bool:
+        """
+        Check if the action α is enabled for s, i.e., if α ∈ A(s) (in O(1) in the mutable mode).
+
+        :param s: a state of this MDP.
+        :param alpha: an action of this MDP.
+        :return: True iff α ∈ A(s).
+        """
+        if self._slots is not None:
+            return alpha in self._slots[s]
+        return alpha in self.act(s)
 
     def act(self, s: int) -> List[int]:
         """
         Get the list of actions enabled for s, i.e., A(s).
 
         :param s: a state of this MDP.
-        :return: the actions enabled for this state s.
+        :return: the actions enabled for this state s, as a read only view of the stored list, created in O(1) without
+                 any copy. In the mutable mode, once an action of s was disabled and until the next compaction, the
+                 remaining actions are copied into a tuple instead (@see compact).
         """
-        return ReadOnlyList(self._enabled_actions[s][0])
+        act_s = self._enabled_actions[s][0]
+        if self._slots is not None and self._tombstones[s]:
+            return tuple(alpha for alpha in act_s if alpha != _TOMBSTONE)
+        return ReadOnlyList(act_s)
+
+    def number_of_enabled_actions(self, s: int) -> int:
+        """
+        Get the number of actions enabled for s, i.e., |A(s)|, without building A(s).
+
+        :param s: a state of this MDP.
+        :return: the number of actions enabled for this state s.
+        """
+        if self._slots is not None:
+            return len(self._slots[s])
+        return len(self._enabled_actions[s][0])
 
     def pred(self, s: int) -> Set[int]:
         """
@@ -131,7 +362,25 @@ class MDP:
         :param s: a state of this MDP.
         :return: the predecessors of s in the underlying graph of this MDP.
         """
-        return self._pred[s]
+        if self._slots is not None and self._pred_stale:
+            return {t for (t, _) in self._live_predecessors(s)}
+        if self._pred_offsets is None:
+            self._build_predecessors()
+        return set(self._pred_states[self._pred_offsets[s]:self._pred_offsets[s + 1]].tolist())
+
+    def number_of_predecessors(self, s: int) -> int:
+        """
+        Get the number of transitions leading to s, i.e., the number of pairs (s*, α) ∈ Pred(s) (@see
+        alpha_predecessors). It is maintained in O(1) by enable_action and disable_action in the mutable mode.
+
+        :param s: a state of this MDP.
+        :return: the number of pairs (s*, α) such that ∆(s*, α, s) > 0.
+        """
+        if self._slots is not None:
+            return self._pred_counts[s]
+        if self._pred_offsets is None:
+            self._build_predecessors()
+        return int(self._pred_offsets[s + 1] - self._pred_offsets[s])
 
     def w(self, alpha: int) -> int:
         """
@@ -149,23 +398,87 @@ class MDP:
         :param s: a state of this MDP.
         :return: an iterator on Pred(s).
         """
-        return map(lambda alpha_pred: (alpha_pred[0],
-                                       self.act(alpha_pred[0])[alpha_pred[1]]),
-                   self._alpha_pred[s])
+        if self._slots is not None and self._pred_stale:
+            return self._live_predecessors(s)
+        if self._pred_offsets is None:
+            self._build_predecessors()
+        lo, hi = self._pred_offsets[s], self._pred_offsets[s + 1]
+        return zip(self._pred_states[lo:hi].tolist(), self._pred_actions[lo:hi].tolist())
+
+    def _live_predecessors(self, s: int) -> Iterator[Tuple[int, int]]:
+        # in the mutable mode, a pair (t, α) of the index is still valid iff α still has the slot it had when the index
+        # was built (the slots of the disabled actions are never reused), and a pair (t, α) enabled since then, stored
+        # with its slot, is valid iff α still has this slot.
+        slots, indexed = self._slots, self._indexed_slots
+        lo, hi = self._pred_offsets[s], self._pred_offsets[s + 1]
+        for (t, alpha) in zip(self._pred_states[lo:hi].tolist(), self._pred_actions[lo:hi].tolist()):
+            if slots[t].get(alpha, indexed[t]) < indexed[t]:
+                yield t, alpha
+        for (t, alpha, slot) in self._pred_extra.get(s, ()):
+            if slots[t].get(alpha) == slot:
+                yield t, alpha
+
+    def predecessor_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the predecessors of the states of this MDP as a reverse compressed sparse row (CSR) index
+        (offsets, states, actions) : Pred(s) = { (states[i], actions[i]) | offsets[s] <= i < offsets[s + 1] }.
+        This index is built on the first call and is kept until this MDP is modified (in the mutable mode, it is rebuilt
+        on the next call after a modification).
+
+        :return: the arrays offsets, states and actions described above.
+        """
+        if self._pred_offsets is None or (self._slots is not None and self._pred_stale):
+            self._build_predecessors()
+        return self._pred_offsets, self._pred_states, self._pred_actions
+
+    def _build_predecessors(self) -> None:
+        sources, actions, successors = [], [], []
+        for (s, alpha, succ_list) in self.choices():
+            for (succ, _) in succ_list:
+                sources.append(s)
+                actions.append(alpha)
+                successors.append(succ)
+        self._set_predecessors(np.array(sources, dtype=np.int64), np.array(actions, dtype=np.int64),
+                               np.array(successors, dtype=np.int64))
+
+    def _set_predecessors(self, sources: np.ndarray, actions: np.ndarray, successors: np.ndarray) -> None:
+        # reverse CSR from the columns of the transitions : the pairs (s*, α) such that ∆(s*, α, s) > 0 are stored in
+        # _pred_states and _pred_actions, between _pred_offsets[s] and _pred_offsets[s + 1].
+        order = np.argsort(successors, kind='stable')
+        self._pred_states = sources[order]
+        self._pred_actions = actions[order]
+        self._pred_offsets = np.zeros(self.number_of_states + 1, dtype=np.int64)
+        np.cumsum(np.bincount(successors, minlength=self.number_of_states), out=self._pred_offsets[1:])
+        if self._slots is not None:
+            self._pred_counts = np.diff(self._pred_offsets).tolist()
+            self._pred_extra: Dict[int, List[Tuple[int, int, int]]] = {}
+            self._indexed_slots = [len(act_s) for (act_s, _) in self._enabled_actions]
+            self._pred_stale = False
 
     def alpha_successors(self, s: int) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
         """
         Get an iterator on the α-successors of s.
         Indeed, let α ∈ A(s) be the first action enabled of s, i.e., act(s)[0].
-        Then, next(alpha_successors(s)) = (α, α-succ) where α-succ a list of the α-successors of s, i.e.
-        an list of element of the set SuccPr(s, α) = { (s', pr) | ∆(s, α, s') > 0 and pr = ∆(s, α, s') }
+        Then, next(alpha_successors(s)) = (α, α-succ) where α-succ a tuple of the α-successors of s, i.e.
+        a tuple of element of the set SuccPr(s, α) = { (s', pr) | ∆(s, α, s') > 0 and pr = ∆(s, α, s') }
 
         :param s: a state of this MDP.
         :return: an iterator as described above.
         """
-        return map(lambda alpha_i: (self._enabled_actions[s][0][alpha_i],
-                                    ReadOnlyList(self._enabled_actions[s][1][alpha_i])),
-                   range(len(self.act(s))))
+        act_s, alpha_succ = self._enabled_actions[s]
+        if self._slots is not None and self._tombstones[s]:
+            return ((alpha, succ_list) for (alpha, succ_list) in zip(act_s, alpha_succ) if alpha != _TOMBSTONE)
+        return zip(act_s, alpha_succ)
+
+    def choices(self) -> Iterator[Tuple[int, int, Tuple[Tuple[int, float], ...]]]:
+        """
+        Get an iterator on all the choices (s, α, α-succ) of this MDP, state by state, where α ∈ A(s) and α-succ is the
+        tuple of the α-successors of s (@see alpha_successors).
+
+        :return: an iterator as described above.
+        """
+        for (s, (act_s, alpha_succ)) in enumerate(self._enabled_actions):
+            yield from ((s, alpha, succ_list) for (alpha, succ_list) in zip(act_s, alpha_succ) if alpha != _TOMBSTONE)
 
     @property
     def number_of_states(self) -> int:
@@ -192,11 +505,21 @@ class MDP:
         :param name: the label of a state.
         :return: the index of this state.
         """
+        self._generate_names()
         try:
-            return self._states_name.index(name)
-        except:
+            return self._names_index(self._states_name, '_states_index')[name]
+        except KeyError:
             raise ValueError('No state labeled %s in this MDP.' % name)
 
+    def state_indices(self, names: Iterable[str]) -> List[int]:
+        """
+        Get the indexes of the states labeled with the names in parameter.
+
+        :param names: labels of states.
+        :return: the list of the indexes of these states, in the same order.
+        """
+        return [self.state_index(name) for name in names]
+
     def action_index(self, name: str):
         """
         Get the index of the action labeled with the name in parameter.
@@ -204,11 +527,31 @@ class MDP:
         :param name: label of an action.
         :return: the index of this action.
         """
+        self._generate_names()
         try:
-            return self._actions_name.index(name)
-        except:
+            return self._names_index(self._actions_name, '_actions_index')[name]
+        except KeyError:
             raise ValueError('No action labeled %s in this MDP.' % name)
 
+    def action_indices(self, names: Iterable[str]) -> List[int]:
+        """
+        Get the indexes of the actions labeled with the names in parameter.
+
+        :param names: labels of actions.
+        :return: the list of the indexes of these actions, in the same order.
+        """
+        return [self.action_index(name) for name in names]
+
+    def _names_index(self, names: List[str], attribute: str) -> Dict[str, int]:
+        # hashed name → index map of a list of names, stored in the attribute in parameter. It is built again as soon
+        # as the list of names is replaced or extended, so that it is always in step with it.
+        names_index = getattr(self, attribute, None)
+        if names_index is None or names_index[0] is not names or names_index[1] != len(names):
+            # the first index of a name is kept, as list.index does
+            names_index = (names, len(names), {name: i for (i, name) in reversed(list(enumerate(names)))})
+            setattr(self, attribute, names_index)
+        return names_index[2]
+
     def state_name(self, s: int) -> str:
         """
         Get the name of the state s.
@@ -254,13 +597,415 @@ class MDP:
                                             for s in range(self.number_of_states)]))[:-1]
 
 
-class UnfoldedMDP(MDP):
+class CompactMDP(MDP):
+    """ Array-backed implementation of Markov Decision Process, following a compressed sparse row (CSR) layout.
+    A choice is a pair (s, α) such that α ∈ A(s). The choices of the s th state are the choices
+    c ∈ [choice_offsets[s], choice_offsets[s + 1]), c is labeled with the action choice_actions[c] and its α-successors
+    are stored in the transitions t ∈ [transition_offsets[c], transition_offsets[c + 1]) :
+
+        choice_offsets      s  →  ┃ c0 ┃ c2 ┃ ...        (number_of_states + 1 offsets)
+        choice_actions      c  →  ┃ α1 ┃ α2 ┃ α1 ┃ ...   (one action per choice)
+        transition_offsets  c  →  ┃ t0 ┃ t3 ┃ ...        (number_of_choices + 1 offsets)
+        successors          t  →  ┃ s'1 ┃ s'2 ┃ ...      (one successor per transition)
+        probabilities       t  →  ┃ ∆(s, α, s'1) ┃ ...  (one probability per transition)
+
+    This MDP is read only : it implements the same read API as MDP so that it can be used by the solvers, while
+    vectorized code can directly read the arrays above. Use CompactMDP.from_mdp and to_mdp to convert a MDP in both
+    ways.
+
+    Initialisation parameters :
+        :param states: A list containing the states' names (see MDP).
+        :param actions: A list containing the actions' names (see MDP).
+        :param w: List of action's weight.
+        :param choice_offsets: array of length number_of_states + 1 mapping each state to its first choice.
+        :param choice_actions: array mapping each choice to its action.
+        :param transition_offsets: array of length number_of_choices + 1 mapping each choice to its first transition.
+        :param successors: array mapping each transition to its successor.
+        :param probabilities: array mapping each transition to its probability.
+    """
+
+    def __init__(self, states: List[str], actions: List[str], w: List[int],
+                 choice_offsets: np.ndarray, choice_actions: np.ndarray, transition_offsets: np.ndarray,
+                 successors: np.ndarray, probabilities: np.ndarray):
+        self._states_name = states
+        self._actions_name = actions
+        self._w = list(w)
+        self._validation = False
+        self.choice_offsets = np.asarray(choice_offsets, dtype=np.int64)
+        self.choice_actions = np.asarray(choice_actions, dtype=np.int32)
+        self.transition_offsets = np.asarray(transition_offsets, dtype=np.int64)
+        self.successors = np.asarray(successors, dtype=np.int32)
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+        # the predecessors of each state are only computed on demand (see _build_predecessors).
+        self._pred_offsets = None
+        self._pred_states = None
+        self._pred_actions = None
+
+    @staticmethod
+    def from_mdp(mdp: MDP) -> 'CompactMDP':
+        """
+        Convert a MDP into a CompactMDP.
+
+        :param mdp: a MDP.
+        :return: a CompactMDP with the same states, actions, weights and transitions as the MDP in parameter.
+        """
+        if isinstance(mdp, CompactMDP):
+            return mdp
+        choice_offsets = [0] * (mdp.number_of_states + 1)
+        choice_actions = []
+        transition_offsets = [0]
+        successors = []
+        probabilities = []
+        for (s, alpha, succ_list) in mdp.choices():
+            choice_offsets[s + 1] += 1
+            choice_actions.append(alpha)
+            for (succ, pr) in succ_list:
+                successors.append(succ)
+                probabilities.append(pr)
+            transition_offsets.append(len(successors))
+        choice_offsets = np.cumsum(choice_offsets)
+        mdp._generate_names()
+        return CompactMDP(mdp._states_name, mdp._actions_name, mdp._w, choice_offsets, choice_actions,
+                          transition_offsets, successors, probabilities)
+
+    def to_mdp(self, validation=True) -> MDP:
+        """
+        Convert this CompactMDP into a (mutable) MDP.
+
+        :param validation: (optional) @see MDP.
+        :return: a MDP with the same states, actions, weights and transitions as this CompactMDP.
+        """
+        transition_choices = self.transition_choices
+        return MDP.from_arrays(list(self._states_name), list(self._actions_name), list(self._w),
+                               self.choice_states[transition_choices], self.choice_actions[transition_choices],
+                               self.successors, self.probabilities, self.number_of_states, validation=validation)
+
+    def enable_action(self, s: int, alpha: int,
+                      delta_s_alpha: Iterable[Tuple[int, float]]) -> None:
+        raise ValueError('A CompactMDP is read only. Use to_mdp() to get a mutable MDP.')
+
+    def disable_action(self, s: int, alpha: int) -> None:
+        raise ValueError('A CompactMDP is read only. Use to_mdp() to get a mutable MDP.')
+
+    def set_mutable(self, mutable: bool = True) -> None:
+        if mutable:
+            raise ValueError('A CompactMDP is read only. Use to_mdp() to get a mutable MDP.')
+
+    @property
+    def number_of_states(self) -> int:
+        return len(self.choice_offsets) - 1
+
+    @property
+    def number_of_choices(self) -> int:
+        """
+        Get the number of choices of this MDP, i.e., the number of pairs (s, α) such that α ∈ A(s).
+
+        :return: the number of choices of this MDP.
+        """
+        return len(self.choice_actions)
+
+    @property
+    def choice_states(self) -> np.ndarray:
+        """
+        Get an array mapping each choice (s, α) of this MDP to its state s.
+
+        :return: the array of the states of each choice.
+        """
+        return np.repeat(np.arange(self.number_of_states, dtype=np.int32), np.diff(self.choice_offsets))
+
+    @property
+    def transition_choices(self) -> np.ndarray:
+        """
+        Get an array mapping each transition of this MDP to its choice.
+
+        :return: the array of the choices of each transition.
+        """
+        return np.repeat(np.arange(self.number_of_choices, dtype=np.int64), np.diff(self.transition_offsets))
+
+    def choices_of(self, states: np.ndarray) -> np.ndarray:
+        """
+        Get the choices of the states in parameter, i.e., the concatenation of the choices of each of these states.
+
+        :param states: an array of states of this MDP.
+        :return: the array of the choices of these states, state by state.
+        """
+        return concatenated_ranges(self.choice_offsets, states)
+
+    def transition_matrix(self) -> sparse.csr_matrix:
+        """
+        Get the transition function of this MDP as a sparse matrix P of shape (number_of_choices, number_of_states)
+        such that P[c, s'] = ∆(s, α, s') where c is the choice (s, α).
+        Note that the arrays of this MDP are shared with P (no copy).
+
+        :return: the transition matrix of this MDP.
+        """
+        return sparse.csr_matrix((self.probabilities, self.successors, self.transition_offsets),
+                                 shape=(self.number_of_choices, self.number_of_states), copy=False)
+
+    def act(self, s: int) -> List[int]:
+        return tuple(self.choice_actions[self.choice_offsets[s]:self.choice_offsets[s + 1]].tolist())
+
+    def number_of_enabled_actions(self, s: int) -> int:
+        return int(self.choice_offsets[s + 1] - self.choice_offsets[s])
+
+    def alpha_successors(self, s: int) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+        lo, hi = self.choice_offsets[s], self.choice_offsets[s + 1]
+        offsets = self.transition_offsets[lo:hi + 1].tolist()
+        successors = self.successors[offsets[0]:offsets[-1]].tolist()
+        probabilities = self.probabilities[offsets[0]:offsets[-1]].tolist()
+        return zip(self.choice_actions[lo:hi].tolist(),
+                   [tuple(zip(successors[i - offsets[0]:j - offsets[0]], probabilities[i - offsets[0]:j - offsets[0]]))
+                    for (i, j) in zip(offsets, offsets[1:])])
+
+    def choices(self) -> Iterator[Tuple[int, int, Tuple[Tuple[int, float], ...]]]:
+        # the arrays are converted once, then sliced choice by choice
+        offsets = self.transition_offsets.tolist()
+        successors = self.successors.tolist()
+        probabilities = self.probabilities.tolist()
+        return zip(self.choice_states.tolist(), self.choice_actions.tolist(),
+                   (tuple(zip(successors[i:j], probabilities[i:j])) for (i, j) in zip(offsets, offsets[1:])))
+
+    def _build_predecessors(self) -> None:
+        transition_choices = self.transition_choices
+        self._set_predecessors(self.choice_states[transition_choices], self.choice_actions[transition_choices],
+                               self.successors)
+
+    def _generate_names(self):
+        if len(self._states_name) < self.number_of_states:
+            self._states_name = ['s' + str(i) for i in range(self.number_of_states)]
+        if len(self._actions_name) != len(self._w):
+            self._actions_name = ['a' + str(i) for i in range(len(self._w))]
+
+    def __str__(self):
+        return str(self.to_mdp(validation=False))
+
+
+class QuotientMDP(MDP):
+    """ Quotient of a MDP by a set of disjoint end components (@see solvers.decomposition.maximal_end_components).
+    Each end component is collapsed into a single state, labeled with the set of its states. The actions enabled for
+    this state are the actions of the states of the end component that can leave it : each of them is a new action
+    labeled 's.α' (with weight w(α)) whose successors in the end component are replaced by the collapsed state.
+    The actions that can not leave their end component are removed, so that a collapsed state that can not be left
+    only has the action 'loop'.
+    The other states and their actions are kept as they are.
+
+    Initialisation parameters :
+        :param mdp: the initial MDP.
+        :param components: a list of disjoint end components of the MDP, each one being a list of states.
+        :param validation: (optional) @see MDP.
+    """
+
+    def __init__(self, mdp: MDP, components: List[List[int]], validation=True):
+        mdp._generate_names()
+        self._mdp = mdp
+        self._components = components
+        component_of = [-1] * mdp.number_of_states
+        for (i, component) in enumerate(components):
+            for s in component:
+                component_of[s] = i
+        # self._state_of[s] is the state of this MDP that contains the state s of the initial MDP, and
+        # self._convert[q] the list of states of the initial MDP contained in the state q of this MDP.
+        self._state_of = [-1] * mdp.number_of_states
+        self._convert: List[List[int]] = []
+        for s in range(mdp.number_of_states):
+            if self._state_of[s] == -1:
+                members = [s] if component_of[s] == -1 else components[component_of[s]]
+                for member in members:
+                    self._state_of[member] = len(self._convert)
+                self._convert.append(members)
+
+        loop = mdp.number_of_actions
+        super().__init__(
+            [mdp.state_name(members[0]) if len(members) == 1 and component_of[members[0]] == -1
+             else '{' + ', '.join(map(mdp.state_name, members)) + '}' for members in self._convert],
+            list(mdp._actions_name) + ['loop'], list(mdp._w) + [1], len(self._convert), validation=False)
+        # self._origin[q][β] = (s, α) where α is the action of the state s of the initial MDP corresponding to the
+        # action β of the collapsed state q.
+        self._origin = {}
+        for (q, members) in enumerate(self._convert):
+            if len(members) == 1 and component_of[members[0]] == -1:
+                for (alpha, succ_list) in mdp.alpha_successors(members[0]):
+                    self.enable_action(q, alpha, [(self._state_of[succ], pr) for (succ, pr) in succ_list])
+                continue
+            origin = self._origin[q] = {}
+            for s in members:
+                for (alpha, succ_list) in mdp.alpha_successors(s):
+                    distribution = {}
+                    for (succ, pr) in succ_list:
+                        distribution[self._state_of[succ]] = distribution.get(self._state_of[succ], 0) + pr
+                    if list(distribution) != [q]:
+                        beta = len(self._w)
+                        self._actions_name.append(mdp.state_name(s) + '.' + mdp.act_name(alpha))
+                        self._w.append(mdp.w(alpha))
+                        self.enable_action(q, beta, list(distribution.items()))
+                        origin[beta] = (s, alpha)
+            if not origin:
+                self.enable_action(q, loop, [(q, 1)])
+        self._validation = validation
+
+    def state_of(self, s: int) -> int:
+        """
+        Get the state of this MDP that contains the state s of the initial MDP.
+
+        :param s: a state of the initial MDP.
+        :return: the index of the state of this MDP containing s.
+        """
+        return self._state_of[s]
+
+    def convert(self, q: int) -> List[int]:
+        """
+        Convert the state index q in this MDP to the list of states of the initial MDP it contains.
+
+        :param q: q th state of this quotient MDP.
+        :return: the list of states of the initial MDP collapsed into q.
+        """
+        return self._convert[q]
+
+    def lift_values(self, x: List[float]) -> List[float]:
+        """
+        Lift a list of values of the states of this MDP to the states of the initial MDP.
+
+        :param x: a list such that x[q] is the value of the state q of this MDP.
+        :return: a list y such that y[s] = x[q] where q is the state of this MDP containing s.
+        """
+        return [x[q] for q in self._state_of]
+
+    def lift_strategy(self, strategy: Callable[[int], int]) -> Callable[[int], int]:
+        """
+        Lift a memoryless strategy of this MDP to the initial MDP.
+        In an end component, the state s from which the action chosen for the collapsed state comes plays the
+        corresponding action of the initial MDP, while the other states play actions that stay in the end component and
+        lead to s with probability 1 (the end component is left from s). If the collapsed state can not be left, each
+        of its states plays an action that stays in the end component.
+
+        :param strategy: a memoryless strategy of this MDP.
+        :return: the corresponding memoryless strategy of the initial MDP.
+        """
+        mdp = self._mdp
+        actions = [-1] * mdp.number_of_states
+        for (q, members) in enumerate(self._convert):
+            if q not in self._origin:
+                actions[members[0]] = strategy(q)
+                continue
+            in_component = set(members)
+            stays = {(s, alpha) for s in members for (alpha, succ_list) in mdp.alpha_successors(s)
+                     if not [succ for (succ, _) in succ_list if succ not in in_component]}
+            beta = strategy(q)
+            if beta in self._origin[q]:
+                s, alpha = self._origin[q][beta]
+                actions[s] = alpha
+                # backward breadth-first search from s through the actions that stay in the end component
+                next = deque([s])
+                while next:
+                    succ = next.pop()
+                    for (pred, alpha) in mdp.alpha_predecessors(succ):
+                        if pred in in_component and actions[pred] == -1 and (pred, alpha) in stays:
+                            actions[pred] = alpha
+                            next.appendleft(pred)
+            else:
+                for (s, alpha) in stays:
+                    actions[s] = alpha
+        return lambda s: actions[s]
+
+
+class SubMDP(MDP):
+    """ View of a MDP restricted to a subset of its states and of its choices, that does not copy any transition.
+    A choice (s, α) of the MDP is a choice of this MDP iff s is a kept state, (s, α) is a kept choice, and all the
+    α-successors of s are kept states, so that the α-successors lists are the ones of the MDP, given as they are.
+    The states keep their index (and their name) : the removed states are still states of this MDP, without any
+    enabled action. Only the predecessors index of this MDP (@see predecessor_arrays) is stored, when it is needed.
+    This MDP is read only.
+
+    Initialisation parameters :
+        :param mdp: the initial MDP. It must not be modified while this view is used.
+        :param states: (optional) a list of booleans (mask) such that states[s] is True iff the state s is kept. All the
+                       states are kept if this parameter is not provided.
+        :param enabled: (optional) a function such that enabled(s, α) is False iff the choice (s, α) is removed (@see
+                        solvers.decomposition.strongly_connected_components). All the choices are kept if this parameter
+                        is not provided.
+    """
+
+    def __init__(self, mdp: MDP, states: List[bool] = None, enabled: Callable[[int, int], bool] = None):
+        mdp._generate_names()
+        self._mdp = mdp
+        self._states_name = mdp._states_name
+        self._actions_name = mdp._actions_name
+        self._w = mdp._w
+        self._validation = False
+        self._kept = states
+        self._enabled = enabled
+        self._pred_offsets = None
+
+    def _keeps(self, s: int, alpha: int, succ_list: Iterable[Tuple[int, float]]) -> bool:
+        # True iff the choice (s, α) of a kept state s is a choice of this MDP
+        if self._enabled is not None and not self._enabled(s, alpha):
+            return False
+        if self._kept is not None:
+            for (succ, _) in succ_list:
+                if not self._kept[succ]:
+                    return False
+        return True
+
+    def enable_action(self, s: int, alpha: int,
+                      delta_s_alpha: Iterable[Tuple[int, float]]) -> None:
+        raise ValueError('A SubMDP is read only.')
+
+    def disable_action(self, s: int, alpha: int) -> None:
+        raise ValueError('A SubMDP is read only.')
+
+    def set_mutable(self, mutable: bool = True) -> None:
+        if mutable:
+            raise ValueError('A SubMDP is read only.')
+
+    @property
+    def modifications(self) -> int:
+        return self._mdp.modifications
+
+    @property
+    def number_of_states(self) -> int:
+        return self._mdp.number_of_states
+
+    def act(self, s: int) -> List[int]:
+        return tuple(alpha for (alpha, _) in self.alpha_successors(s))
+
+    def number_of_enabled_actions(self, s: int) -> int:
+        if self._kept is None and self._enabled is None:
+            return self._mdp.number_of_enabled_actions(s)
+        return sum(1 for _ in self.alpha_successors(s))
+
+    def alpha_successors(self, s: int) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+        if self._kept is not None and not self._kept[s]:
+            return iter(())
+        return ((alpha, succ_list) for (alpha, succ_list) in self._mdp.alpha_successors(s)
+                if self._keeps(s, alpha, succ_list))
+
+    def choices(self) -> Iterator[Tuple[int, int, Tuple[Tuple[int, float], ...]]]:
+        return ((s, alpha, succ_list) for s in range(self.number_of_states)
+                for (alpha, succ_list) in self.alpha_successors(s))
+
+    def _generate_names(self):
+        pass
+
+    def __str__(self):
+        return '\n'.join(self.state_name(s) + ' -> ' + str((
+            [self.act_name(alpha) + '|' + str(self._w[alpha]) for (alpha, _) in self.alpha_successors(s)],
+            [[(self.state_name(succ), pr) for (succ, pr) in succ_list] for (_, succ_list) in self.alpha_successors(s)]))
+            for s in range(self.number_of_states))
+
+
+class UnfoldedMDP(CompactMDP):
     """ Unfold an MDP following an initial state (s0), a list of target states (T) and a maximum length threshold (l)
     (@see stochastic shortest path percentile problem in solvers.sspp).
     The states of this new MDP take the following form : (s, v) where s is a state of the initial MDP and v is the
     current traveled length.
     This generates a new MDP object from a MDP and these parameters on which the reachability to
     T* = { (t, v) | t ∈ T and v <= l } can be computed.
+    The MDP is unfolded layer by layer, following v : since the weights are > 0, the successors of the states of
+    a layer v only belong to the next layers, so that the states of the layer v are all known when it is reached.
+    The states of each layer are indexed at once, and their choices and transitions are appended in bulk to the
+    arrays of this (read only) CompactMDP. The initial state (s0, v) has index 0 and ⊥ is the last state.
+    If a lower bound d[s] of the length of the paths from each state s to T is provided, the states (s, v) such that
+    v + d[s] > l are not unfolded : they are directly replaced by ⊥.
 
     Initialisation parameters :
         :param mdp: the initial MDP to unfold.
@@ -268,84 +1013,117 @@ class UnfoldedMDP(MDP):
         :param T: target states.
         :param l: maximum length threshold.
         :param v: (optional) set this parameter if you want an initial state (s0, v) where v > 0.
+        :param d: (optional) a list such that d[s] is a lower bound of the length of the paths from s to T, e.g., the
+                  minimal weight of the paths from s to T (@see solvers.reachability.minimal_weight_to).
     """
 
-    def __init__(self, mdp: MDP, s0: int, T: List[int], l: int, v: int = 0, validation=True):
+    def __init__(self, mdp: MDP, s0: int, T: List[int], l: int, v: int = 0, validation=True,
+                 d: List[float] = None):
         mdp._generate_names()
-        self._states_name = mdp._states_name + ['⊥']
-        self._actions_name = mdp._actions_name + ['loop']
-        self._validation = False
-        self._w = mdp._w + [1]
-        self._enabled_actions: List[Tuple[List[int], List[List[Tuple[int, float]]]]] = []
-        self._pred: List[Set[int]] = []
-        self._alpha_pred: List[List[Tuple[int, int]]] = []
+        compact = CompactMDP.from_mdp(mdp)
+        loop = mdp.number_of_actions
+        n = compact.number_of_states
+        is_target = np.zeros(n, dtype=bool)
+        is_target[list(T)] = True
+        weights = np.array(compact._w, dtype=np.int64)[compact.choice_actions]
+        choices_number = np.diff(compact.choice_offsets)
+        transitions_number = np.diff(compact.transition_offsets)
+        d = np.zeros(n) if d is None else np.asarray(d, dtype=np.float64)
+
+        # pending[v'] is the list of the transitions of the already unfolded states that lead to the layer v', given
+        # as (successors, positions, states) such that successors[positions] must receive the indexes of the states
+        # (s', v') for s' ∈ states.
+        pending = {v: [(np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), np.array([s0]))]}
+        self._convert = []
         self._T = []
+        self._unfolded_index = None
+        layer_choices_number, layer_actions, layer_transitions_number, layer_successors, layer_probabilities = \
+            [], [], [], [], []
+        number_of_states = 0
+        for v in range(v, max(l, v) + 1):
+            if v not in pending:
+                continue
+            # index the states of the layer v
+            references = pending.pop(v)
+            states, inverse = np.unique(np.concatenate([states for (_, _, states) in references]),
+                                        return_inverse=True)
+            inverse = inverse.reshape(-1) + number_of_states
+            i = 0
+            for (successors, positions, _) in references:
+                successors[positions] = inverse[i:i + len(positions)]
+                i += len(positions)
+            indexes = np.arange(number_of_states, number_of_states + len(states))
+            number_of_states += len(states)
+            self._convert.extend(zip(states.tolist(), [v] * len(states)))
+            targets = is_target[states]
+            self._T.extend(indexes[targets].tolist())
+
+            # the only action of a target state is 'loop', with ∆((t, v), 'loop', (t, v)) = 1
+            choices = compact.choices_of(states[~targets])
+            states_choices_number = np.ones(len(states), dtype=np.int64)
+            states_choices_number[~targets] = choices_number[states[~targets]]
+            # position of the choices of the states of the layer that are not target states
+            not_target = np.repeat(~targets, states_choices_number)
+            actions = np.full(len(not_target), loop, dtype=np.int32)
+            actions[not_target] = compact.choice_actions[choices]
+            # the successors (s', v') such that v' + d[s'] > l can not reach T with a path length <= l : they are
+            # replaced by ⊥ (whose index is -1 until the end), and the transitions of a choice to ⊥ are merged.
+            lengths = v + weights[choices]
+            transitions = concatenated_ranges(compact.transition_offsets, choices)
+            transition_choices = np.repeat(np.arange(len(choices)), transitions_number[choices])
+            successor_states = compact.successors[transitions]
+            successor_lengths = lengths[transition_choices]
+            pruned = successor_lengths + d[successor_states] > l
+            kept = ~pruned
+            to_bot = np.bincount(transition_choices[pruned], minlength=len(choices)) > 0
+            probabilities = compact.probabilities[transitions]
+            bot_probabilities = np.bincount(transition_choices[pruned], weights=probabilities[pruned],
+                                            minlength=len(choices))
+            kept_number = np.bincount(transition_choices[kept], minlength=len(choices))
+            bot_probabilities[kept_number == 0] = 1.
+            # the transitions of each choice are its kept transitions followed by its transition to ⊥
+            order = np.argsort(np.concatenate((transition_choices[kept], np.flatnonzero(to_bot))), kind='stable')
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+
+            choice_transitions_number = np.ones(len(not_target), dtype=np.int64)
+            choice_transitions_number[not_target] = kept_number + to_bot
+            transitions_not_target = np.flatnonzero(np.repeat(not_target, choice_transitions_number))
+            successors = np.full(choice_transitions_number.sum(), -1, dtype=np.int64)
+            successors[np.repeat(~not_target, choice_transitions_number)] = indexes[targets]
+            kept_probabilities = probabilities[kept]
+            probabilities = np.ones(len(successors), dtype=np.float64)
+            probabilities[transitions_not_target[rank]] = np.concatenate((kept_probabilities,
+                                                                          bot_probabilities[to_bot]))
+            positions = transitions_not_target[rank[:kept.sum()]]
+            successor_states = successor_states[kept]
+            successor_lengths = successor_lengths[kept]
+            for length in np.unique(successor_lengths).tolist():
+                same_length = successor_lengths == length
+                pending.setdefault(length, []).append((successors, positions[same_length],
+                                                       successor_states[same_length]))
+
+            layer_choices_number.append(states_choices_number)
+            layer_actions.append(actions)
+            layer_transitions_number.append(choice_transitions_number)
+            layer_successors.append(successors)
+            layer_probabilities.append(probabilities)
 
-        bot_alpha_pred = []
-        Tset = set(T)
-        # dict version
-        A = [{} for _ in range(mdp.number_of_states)]
-        # matrix version
-        # A = [[None] * (l + 1) for _ in range(mdp.number_of_states)]
-        # self._convert is used to convert a state index in this MDP to the real (s, v) where s is a state in the
-        # initial MDP.
-        self._convert = []
-        self._number_of_states = 0
-
-        def fill(s: int):
-            if s == len(self._enabled_actions):
-                self._enabled_actions.append(([], []))
-                self._pred.append(set())
-                self._alpha_pred.append([])
-
-        def unfold(s, v):
-            """
-            Build recursively the unfolded MDP from the initial MDP.
-
-            :param s: current state.
-            :param v: current path length.
-            :return: the index of (s, v) in this unfolded MDP.
-            """
-            # get the index of (s, v) in the unfolded MDP. If (s, v) has no index, a new index is allocated to it.
-            # dict version
-            i = A[s][v] = A[s].get(v, self._number_of_states)
-            # matrix version
-            # i = A[s][v] if A[s][v] else self._number_of_states
-            # A[s][v] = i
-            # if a new index is allocated to s, it is because s was never considered. So an unfolding from s
-            # is required. The following code enable the actions α of (s, v) and compute its α-successors.
-            if i == self._number_of_states:
-                self._convert.append((s, v))
-                self._number_of_states += 1
-                fill(i)
-                if s in Tset:
-                    # it is unless to continue the unfold from t if s ∈ T because it will not be considered by the
-                    # reachability problem solver. So, only the action 'loop' is enabled for s and ∆(s, 'loop', s) = 1.
-                    self.enable_action(i, len(self._w) - 1, [(i, 1)])
-                    self._T.append(i)
-                else:
-                    for (alpha, succ_list) in mdp.alpha_successors(s):
-                        if v + mdp.w(alpha) > l:
-                            bot_alpha_pred.append((i, alpha))
-                        else:
-                            v_new = v + mdp.w(alpha)
-                            to_enable = []
-                            for (succ, pr) in succ_list:
-                                j = unfold(succ, v_new)
-                                to_enable.append((j, pr))
-                            self.enable_action(i, alpha, to_enable)
-            return i
-
-        import sys
-        sys.setrecursionlimit(3000)
-        unfold(s0, v)
         # Add the ⊥ state. It corresponds to all states (s, v) such that v > l. Its only enabled action is 'loop'.
         self._convert.append((-1, Bot()))
-        self._enabled_actions.append(([len(self._w) - 1], [[(len(self._enabled_actions), 1)]]))
-        self._pred.append(set())
-        self._alpha_pred.append([])
-        for (pred, alpha) in bot_alpha_pred:
-            self.enable_action(pred, alpha, [(self._number_of_states, 1)])
+        layer_choices_number.append(np.ones(1, dtype=np.int64))
+        layer_actions.append(np.full(1, loop, dtype=np.int32))
+        layer_transitions_number.append(np.ones(1, dtype=np.int64))
+        layer_successors.append(np.full(1, -1, dtype=np.int64))
+        layer_probabilities.append(np.ones(1, dtype=np.float64))
+        successors = np.concatenate(layer_successors)
+        successors[successors == -1] = number_of_states
+
+        super().__init__(mdp._states_name + ['⊥'], mdp._actions_name + ['loop'], mdp._w + [1],
+                         np.concatenate(([0], np.cumsum(np.concatenate(layer_choices_number)))),
+                         np.concatenate(layer_actions),
+                         np.concatenate(([0], np.cumsum(np.concatenate(layer_transitions_number)))),
+                         successors, np.concatenate(layer_probabilities))
         self._validation = validation
 
     @property
@@ -368,36 +1146,25 @@ class UnfoldedMDP(MDP):
     def state_index(self, name: str):
         """
         Get the index of the state labeled with the name in parameter.
-        Format : '(state_name, v)'
+        Format : '(state_name, v)' (or '⊥')
 
         :param name: the label of a state.
         :return: the index of this state.
         """
-        name_list = list(name)
-        name_list.remove('(')
-        name_list.reverse()
-        name_list.remove(')')
-        first = False
-        s = ''
-        v = ''
-        for char in name_list:
-            if first:
-                s = char + s
-            elif char != ',':
-                if char != " ":
-                    v = char + v
-            else:
-                v = int(v)
-                first = True
-
+        if name == '⊥':
+            return self.number_of_states - 1
+        s, v = _parse_unfolded_state_name(name)
         try:
-            i = self._states_name.index(s)
-            for state in range(self.number_of_states):
-                if self._convert[state] == (i, v):
-                    return state
-        except:
+            i = self._names_index(self._states_name, '_states_index')[s]
+        except KeyError:
             raise ValueError('No state labeled %s in the MDP.' % s)
-        raise ValueError('No state labeled (%s, %d) in this unfolded MDP.' % (s, v))
+        # reverse index (s, v) → index of (s, v) in this unfolded MDP, built on the first call
+        if self._unfolded_index is None:
+            self._unfolded_index = {s_v: state for (state, s_v) in enumerate(self._convert[:-1])}
+        try:
+            return self._unfolded_index[(i, v)]
+        except KeyError:
+            raise ValueError('No state labeled (%s, %d) in this unfolded MDP.' % (s, v))
 
     def _generate_names(self):
         pass
@@ -413,6 +1180,203 @@ class UnfoldedMDP(MDP):
         return self._convert[s]
 
 
+class LazyUnfoldedMDP(MDP):
+    """ Lazy view of the MDP unfolded following an initial state (s0), a list of target states (T) and a maximum length
+    threshold (l) (@see UnfoldedMDP).
+    Only the states (s, v) reachable from (s0, v) are stored, as a sorted array of states s per layer v : the actions
+    and the α-successors of (s, v) are computed on demand from the initial MDP, by shifting the α-successors of s by
+    w(α). Thus, the memory used by this MDP is proportional to its number of states instead of its number of
+    transitions. The states are indexed in the same way as in UnfoldedMDP (layer by layer, following v, and the states s
+    of a layer by increasing index), (s0, v) has index 0 and ⊥ is the last state.
+    This MDP is read only.
+
+    Initialisation parameters :
+        :param mdp: the initial MDP to unfold. It must not be modified while this view is used.
+        :param s0: the initial state from which the mdp will be unfolded.
+        :param T: target states.
+        :param l: maximum length threshold.
+        :param v: (optional) set this parameter if you want an initial state (s0, v) where v > 0.
+        :param d: (optional) @see UnfoldedMDP.
+    """
+
+    def __init__(self, mdp: MDP, s0: int, T: List[int], l: int, v: int = 0, d: List[float] = None):
+        mdp._generate_names()
+        self._mdp = mdp
+        self._states_name = mdp._states_name + ['⊥']
+        self._actions_name = mdp._actions_name + ['loop']
+        self._w = mdp._w + [1]
+        self._validation = False
+        self._l = l
+        self._Tset = set(T)
+        self._d = [0] * mdp.number_of_states if d is None else d
+
+        compact = CompactMDP.from_mdp(mdp)
+        is_target = np.zeros(compact.number_of_states, dtype=bool)
+        is_target[list(T)] = True
+        weights = np.array(compact._w, dtype=np.int64)[compact.choice_actions]
+        transitions_number = np.diff(compact.transition_offsets)
+        d = np.asarray(self._d, dtype=np.float64)
+        # self._layers[k] is the sorted array of the states s such that (s, self._lengths[k]) is reachable, and
+        # self._offsets[k] the index of its first state.
+        self._lengths: List[int] = []
+        self._layers: List[np.ndarray] = []
+        self._offsets: List[int] = [0]
+        self._T = []
+        pending = {v: [np.array([s0])]}
+        for v in range(v, max(l, v) + 1):
+            if v not in pending:
+                continue
+            states = np.unique(np.concatenate(pending.pop(v)))
+            self._T.extend((self._offsets[-1] + np.flatnonzero(is_target[states])).tolist())
+            self._lengths.append(v)
+            self._layers.append(states)
+            self._offsets.append(self._offsets[-1] + len(states))
+            choices = compact.choices_of(states[~is_target[states]])
+            transitions = concatenated_ranges(compact.transition_offsets, choices)
+            successor_states = compact.successors[transitions]
+            successor_lengths = np.repeat(v + weights[choices], transitions_number[choices])
+            kept = successor_lengths + d[successor_states] <= l
+            for length in np.unique(successor_lengths[kept]).tolist():
+                pending.setdefault(length, []).append(successor_states[kept & (successor_lengths == length)])
+        self._layer_of = {v: k for (k, v) in enumerate(self._lengths)}
+        self._bot = self._offsets[-1]
+        self._bot_alpha_pred = None
+        self._pred_offsets = None
+
+    def _index(self, s: int, v: int) -> int:
+        # index of (s, v), -1 if (s, v) is not a state of this MDP
+        k = self._layer_of.get(v)
+        if k is None:
+            return -1
+        i = int(np.searchsorted(self._layers[k], s))
+        if i < len(self._layers[k]) and self._layers[k][i] == s:
+            return self._offsets[k] + i
+        return -1
+
+    def enable_action(self, s: int, alpha: int,
+                      delta_s_alpha: Iterable[Tuple[int, float]]) -> None:
+        raise ValueError('A LazyUnfoldedMDP is read only.')
+
+    def disable_action(self, s: int, alpha: int) -> None:
+        raise ValueError('A LazyUnfoldedMDP is read only.')
+
+    def set_mutable(self, mutable: bool = True) -> None:
+        if mutable:
+            raise ValueError('A LazyUnfoldedMDP is read only.')
+
+    @property
+    def number_of_states(self) -> int:
+        return self._bot + 1
+
+    def act(self, s: int) -> List[int]:
+        s_mdp, _ = self.convert(s)
+        if s == self._bot or s_mdp in self._Tset:
+            return len(self._w) - 1,
+        return self._mdp.act(s_mdp)
+
+    def number_of_enabled_actions(self, s: int) -> int:
+        s_mdp, _ = self.convert(s)
+        return 1 if s == self._bot or s_mdp in self._Tset else self._mdp.number_of_enabled_actions(s_mdp)
+
+    def alpha_successors(self, s: int) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+        s_mdp, v = self.convert(s)
+        if s == self._bot or s_mdp in self._Tset:
+            return iter([(len(self._w) - 1, ((s, 1),))])
+        return ((alpha, self._shift(v + self._mdp.w(alpha), succ_list))
+                for (alpha, succ_list) in self._mdp.alpha_successors(s_mdp))
+
+    def choices(self) -> Iterator[Tuple[int, int, Tuple[Tuple[int, float], ...]]]:
+        return ((s, alpha, succ_list) for s in range(self.number_of_states)
+                for (alpha, succ_list) in self.alpha_successors(s))
+
+    def _shift(self, v: int, succ_list: Iterable[Tuple[int, float]]) -> Tuple[Tuple[int, float], ...]:
+        # α-successors (s', v) of a state of this MDP from the α-successors s' in the initial MDP, the ones that can not
+        # reach T with a path length <= l being merged into ⊥
+        successors = []
+        bot_pr = 0
+        for (succ, pr) in succ_list:
+            if v + self._d[succ] <= self._l:
+                successors.append((self._index(succ, v), pr))
+            else:
+                bot_pr += pr
+        if bot_pr:
+            successors.append((self._bot, bot_pr if successors else 1.))
+        return tuple(successors)
+
+    def pred(self, s: int) -> Set[int]:
+        return {pred for (pred, _) in self.alpha_predecessors(s)}
+
+    def alpha_predecessors(self, s: int) -> Iterator[Tuple[int, int]]:
+        loop = len(self._w) - 1
+        if s == self._bot:
+            # the α-predecessors of ⊥ are computed once, by looking through all the states
+            if self._bot_alpha_pred is None:
+                self._bot_alpha_pred = [(pred, alpha) for pred in range(self._bot)
+                                        for (alpha, succ_list) in self.alpha_successors(pred)
+                                        if alpha != loop and succ_list[-1][0] == self._bot]
+            return iter(self._bot_alpha_pred + [(s, loop)])
+        s_mdp, v = self.convert(s)
+        alpha_pred = [(s, loop)] if s_mdp in self._Tset else []
+        for (pred, alpha) in self._mdp.alpha_predecessors(s_mdp):
+            i = self._index(pred, v - self._mdp.w(alpha)) if pred not in self._Tset else -1
+            if i != -1:
+                alpha_pred.append((i, alpha))
+        return iter(alpha_pred)
+
+    @property
+    def target_states(self):
+        """
+        @see UnfoldedMDP.target_states
+        """
+        return self._T
+
+    def state_name(self, s: int) -> str:
+        s, v = self.convert(s)
+        if s != -1:
+            return '(' + self._states_name[s] + ', ' + str(v) + ')'
+        else:
+            return '⊥'
+
+    def state_index(self, name: str):
+        """
+        Get the index of the state labeled with the name in parameter.
+        Format : '(state_name, v)' (or '⊥')
+
+        :param name: the label of a state.
+        :return: the index of this state.
+        """
+        if name == '⊥':
+            return self._bot
+        s, v = _parse_unfolded_state_name(name)
+        try:
+            i = self._index(self._names_index(self._states_name, '_states_index')[s], v)
+        except KeyError:
+            raise ValueError('No state labeled %s in the MDP.' % s)
+        if i == -1:
+            raise ValueError('No state labeled (%s, %d) in this unfolded MDP.' % (s, v))
+        return i
+
+    def _generate_names(self):
+        pass
+
+    def convert(self, s: int) -> Tuple[int, int]:
+        """
+        @see UnfoldedMDP.convert
+        """
+        if s == self._bot:
+            return -1, Bot()
+        k = bisect_right(self._offsets, s) - 1
+        return int(self._layers[k][s - self._offsets[k]]), self._lengths[k]
+
+
+def _parse_unfolded_state_name(name: str) -> Tuple[str, int]:
+    # (state_name, v) from the name '(state_name, v)' of a state of an unfolded MDP
+    name = name.replace('(', '', 1)
+    i = name.rindex(')')
+    s, _, v = (name[:i] + name[i + 1:]).rpartition(',')
+    return s, int(v.replace(' ', ''))
+
+
 class SelfGrowingMDP(MDP):
     def __init__(self, max_size: int, fixed_actions=0):
         super().__init__([], [], [1, 1], number_of_states=1)
@@ -442,8 +1406,6 @@ class SelfGrowingMDP(MDP):
 
             current_s = self.number_of_states
             self._enabled_actions.append(([], []))
-            self._pred.append(set())
-            self._alpha_pred.append([])
 
             pr = 1. / (self.number_of_states - len(self._absorbing_states))
 
@@ -468,10 +1430,12 @@ class SelfGrowingMDP(MDP):
                 self.enable_action(current_s, alpha, to_enable)
 
             for s in range(1, self.number_of_states - 1):
-                for act_i in range(len(self.act(s))):
+                for act_i in range(self.number_of_enabled_actions(s)):
                     (succ, pr) = self._enabled_actions[s][1][act_i][-1]
-                    self._enabled_actions[s][1][act_i][-1] = (succ, pr / 2)
-                    self._enabled_actions[s][1][act_i].append((current_s, pr / 2))
+                    self._enabled_actions[s][1][act_i] = self._enabled_actions[s][1][act_i][:-1] + \
+                        ((succ, pr / 2), (current_s, pr / 2))
+            self._pred_offsets = None
+            self._modifications += 1
 
             # self._validation = True
             return self
@@ -1,11 +1,19 @@
+import contextlib
 import functools
+import gc
+from collections.abc import Sequence
 
+import numpy as np
 
-class ReadOnlyList(list):
+
+class ReadOnlyList(Sequence):
     """
-    A read only proxy for list.
+    A read only proxy for list : it does not copy the list, so that it is created in O(1) and always reflects the
+    current content of the list.
     """
 
+    __slots__ = ('_list',)
+
     def __init__(self, other):
         self._list = other
 
@@ -15,19 +23,29 @@ class ReadOnlyList(list):
     def __iter__(self):
         return iter(self._list)
 
-    def __slice__(self, *args, **kw):
-        return self._list.__slice__(*args, **kw)
-
-    def __repr__(self):
-        return repr(self._list)
+    def __contains__(self, value):
+        return value in self._list
 
     def __len__(self):
         return len(self._list)
 
-    def NotImplemented(self, *args, **kw):
-        raise ValueError("Read Only list proxy")
+    def index(self, value, *args):
+        return self._list.index(value, *args)
 
-    append = pop = __setitem__ = __setslice__ = __delitem__ = NotImplemented
+    def count(self, value):
+        return self._list.count(value)
+
+    def __eq__(self, other):
+        if isinstance(other, ReadOnlyList):
+            other = other._list
+        if isinstance(other, tuple):
+            other = list(other)
+        return isinstance(other, list) and self._list == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._list)
 
 
 @functools.total_ordering
@@ -47,4 +65,32 @@ class Bot(NeverSmaller, int):
         return '⊥'
 
     def __str__(self):
-        return self.__repr__()
\ No newline at end of file
+        return self.__repr__()
+
+
+@contextlib.contextmanager
+def paused_gc():
+    """
+    Context manager that pauses the garbage collector, e.g., while the lists and tuples of a large MDP are created in
+    bulk : they can not form reference cycles, but their creation triggers many useless collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def concatenated_ranges(offsets: np.ndarray, items: np.ndarray) -> np.ndarray:
+    """
+    Concatenate the ranges [offsets[i], offsets[i + 1]) of the items i of a compressed sparse row (CSR) index, e.g.,
+    the choices of some states of a CompactMDP, without any python loop.
+
+    :param offsets: the offsets of the CSR index.
+    :param items: an array of items of the CSR index.
+    :return: the array of the concatenation of the ranges of the items, item by item.
+    """
+    lo, hi = offsets[items], offsets[items + 1]
+    return np.repeat(lo - np.concatenate(([0], np.cumsum(hi - lo)[:-1])), hi - lo) + np.arange((hi - lo).sum())
@@ -0,0 +1,23 @@
+"""
+Tests of the binary MDP files (@see io_utils.binary).
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+from io_utils import binary, yaml_parser
+
+
+def test_save_load(tmp_path):
+    with open(myPath + '/../examples/mdp2.yaml', 'r') as stream:
+        mdp = yaml_parser.import_from_yaml(stream)
+    file_name = str(tmp_path / 'mdp2')
+    binary.save(mdp, file_name)
+    for loaded in (binary.load(file_name), binary.load(file_name + binary.EXTENSION, memory_map=False)):
+        assert list(loaded.choices()) == list(mdp.choices())
+        assert [loaded.state_name(s) for s in range(loaded.number_of_states)] == \
+               [mdp.state_name(s) for s in range(mdp.number_of_states)]
+        assert [loaded.w(alpha) for alpha in range(loaded.number_of_actions)] == \
+               [mdp.w(alpha) for alpha in range(mdp.number_of_actions)]
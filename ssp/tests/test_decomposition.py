@@ -0,0 +1,63 @@
+"""
+Tests of the decompositions of the MDPs into strongly connected components and maximal end components (@see
+solvers.decomposition).
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+from structures.mdp import MDP, SubMDP
+from solvers.decomposition import maximal_end_components
+
+
+def random_sparse_MDP(n: int, a: int) -> MDP:
+    # random MDP whose actions have at most two successors, and whose states may have no enabled action
+    mdp = MDP([], [], [random.randint(1, 3) for _ in range(a)], n)
+    for s in range(n):
+        for alpha in random.sample(range(a), random.randint(0, a)):
+            successors = random.sample(range(n), random.randint(1, 2))
+            mdp.enable_action(s, alpha, [(succ, 1. / len(successors)) for succ in successors])
+    return mdp
+
+
+def is_end_component(mdp: MDP, C: list) -> bool:
+    # C is an end component iff each of its states has an action staying in C, and C is strongly connected with them
+    C_set = set(C)
+    staying = {s: [succ for (_, succ_list) in mdp.alpha_successors(s)
+                   if all(succ in C_set for (succ, _) in succ_list) for (succ, _) in succ_list] for s in C}
+    if not all(staying.values()):
+        return False
+    for s in C:
+        reached, stack = {s}, [s]
+        while stack:
+            for succ in staying[stack.pop()]:
+                if succ not in reached:
+                    reached.add(succ)
+                    stack.append(succ)
+        if reached != C_set:
+            return False
+    return True
+
+
+def test_states_without_actions():
+    mdp = MDP([], [], [1], 3)
+    mdp.enable_action(0, 0, [(1, 1.)])
+    mdp.enable_action(2, 0, [(2, 1.)])
+    assert maximal_end_components(mdp) == [[2]]
+    assert maximal_end_components(SubMDP(mdp, states=[True, True, False])) == []
+
+
+def test_random_mdps():
+    random.seed(11)
+    for _ in range(300):
+        mdp = random_sparse_MDP(random.randint(2, 15), 3)
+        components = maximal_end_components(mdp)
+        assert all(is_end_component(mdp, C) for C in components)
+        covered = [s for C in components for s in C]
+        assert len(covered) == len(set(covered))
+        # the states that belong to no MEC are not in any end component, e.g., they have no action staying in a MEC
+        for s in set(range(mdp.number_of_states)) - set(covered):
+            assert not is_end_component(mdp, [s])
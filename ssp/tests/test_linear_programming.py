@@ -0,0 +1,51 @@
+"""
+Tests of the linear programs solved in-process with HiGHS (@see solvers.linear_programming), checked against known
+values and against the puLp linear programs.
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+import pulp
+import pytest
+from structures.mdp import MDP
+from structures.generator import random_MDP
+from solvers.reachability import reach
+from solvers.sspe import min_expected_cost
+
+cbc_available = pulp.PULP_CBC_CMD(msg=0).available()
+
+
+def test_known_values():
+    # from the state 0, α reaches T = {1} with probability 0.3 / (0.3 + 0.2) = 0.6 by looping, β with probability 0.5
+    mdp = MDP([], [], [1, 2], 3)
+    mdp.enable_action(0, 0, [(0, .5), (1, .3), (2, .2)])
+    mdp.enable_action(0, 1, [(1, .5), (2, .5)])
+    mdp.enable_action(1, 0, [(1, 1.)])
+    mdp.enable_action(2, 0, [(2, 1.)])
+    x = reach(mdp, [1], solver='highs')
+    assert abs(x[0] - .6) < 1e-9 and x[1] == 1 and x[2] == 0
+    # from the state 0, α reaches T = {1} in 2 steps of weight 1 on average, β in 1 step of weight 3
+    mdp = MDP([], [], [1, 3], 2)
+    mdp.enable_action(0, 0, [(0, .5), (1, .5)])
+    mdp.enable_action(0, 1, [(1, 1.)])
+    mdp.enable_action(1, 0, [(1, 1.)])
+    x = min_expected_cost(mdp, [1], solver='highs')
+    assert abs(x[0] - 2.) < 1e-9 and x[1] == 0
+
+
+@pytest.mark.skipif(not cbc_available, reason='the CBC solver of puLp is not available')
+def test_same_as_pulp():
+    random.seed(8)
+    for _ in range(10):
+        mdp = random_MDP(12, 3, weights_interval=(1, 5), force_weakly_connected_to=True)
+        T = random.sample(range(12), 2)
+        x, y = reach(mdp, T, solver='highs'), reach(mdp, T, solver=pulp.PULP_CBC_CMD(msg=0))
+        assert max(abs(x_s - y_s) for (x_s, y_s) in zip(x, y)) < 1e-6
+        x = min_expected_cost(mdp, T, solver='highs')
+        y = min_expected_cost(mdp, T, solver=pulp.PULP_CBC_CMD(msg=0))
+        assert [x_s == float('inf') for x_s in x] == [y_s == float('inf') for y_s in y]
+        assert max(abs(x_s - y_s) / max(1., y_s) for (x_s, y_s) in zip(x, y) if y_s != float('inf')) < 1e-6
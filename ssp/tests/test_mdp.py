@@ -0,0 +1,52 @@
+"""
+Tests of the bulk construction of the MDPs (@see structures.mdp.MDP.from_arrays).
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+import pytest
+from structures.mdp import MDP
+from structures.generator import random_MDP
+
+
+def columns(mdp: MDP):
+    # the columns of the transitions of a MDP, in the order of its choices
+    transitions = [(s, alpha, succ, pr) for (s, alpha, succ_list) in mdp.choices() for (succ, pr) in succ_list]
+    return [list(column) for column in zip(*transitions)]
+
+
+def test_same_as_enable_action():
+    random.seed(16)
+    for _ in range(20):
+        mdp = random_MDP(random.randint(1, 15), 4)
+        sources, alphas, successors, probabilities = columns(mdp)
+        # the transitions are shuffled : the actions of each state are enabled following their first occurrence
+        order = list(range(len(sources)))
+        random.shuffle(order)
+        built = MDP.from_arrays([], [], mdp._w, [sources[i] for i in order], [alphas[i] for i in order],
+                                [successors[i] for i in order], [probabilities[i] for i in order],
+                                mdp.number_of_states)
+        assert built.number_of_states == mdp.number_of_states
+        for s in range(mdp.number_of_states):
+            assert sorted((alpha, sorted(succ_list)) for (alpha, succ_list) in built.alpha_successors(s)) == \
+                sorted((alpha, sorted(succ_list)) for (alpha, succ_list) in mdp.alpha_successors(s))
+            assert sorted(built.alpha_predecessors(s)) == sorted(mdp.alpha_predecessors(s))
+        # in the order of the choices, the MDP is built as it is
+        assert list(MDP.from_arrays([], [], mdp._w, sources, alphas, successors, probabilities,
+                                    mdp.number_of_states).choices()) == list(mdp.choices())
+
+
+def test_validation():
+    # the indexes are checked first, then every probability error is reported at once
+    with pytest.raises(ValueError) as error:
+        MDP.from_arrays(['s', 't'], ['a'], [1], [0, 2], [0, 1], [0, 3], [1., 1.])
+    assert 'states' in str(error.value) and 'actions' in str(error.value) and 'successors' in str(error.value)
+    with pytest.raises(ValueError) as error:
+        MDP.from_arrays(['s', 't'], ['a', 'b'], [1, 1], [0, 0, 1, 1], [0, 0, 0, 1], [0, 1, 1, 1], [.5, .4, 1., 1.5])
+    message = str(error.value)
+    assert "0 < ∆(s, α, s') <= 1" in message and 'distribution' in message
+    MDP.from_arrays([], [], [1], [0], [0], [0], [.5], validation=False)
@@ -0,0 +1,79 @@
+"""
+Tests of the mutable mode of the MDPs (@see structures.mdp.MDP.set_mutable) : the predecessors of the states must stay
+the ones of the MDP rebuilt from its choices, whatever the series of modifications.
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+from structures.mdp import MDP
+from structures.generator import random_MDP
+
+
+def rebuilt(mdp: MDP) -> MDP:
+    sources, alphas, successors, probabilities = [], [], [], []
+    for (s, alpha, succ_list) in mdp.choices():
+        for (succ, pr) in succ_list:
+            sources.append(s)
+            alphas.append(alpha)
+            successors.append(succ)
+            probabilities.append(pr)
+    return MDP.from_arrays([], [], mdp._w, sources, alphas, successors, probabilities, mdp.number_of_states)
+
+
+def assert_same_predecessors(mdp: MDP) -> None:
+    expected = rebuilt(mdp)
+    for s in range(mdp.number_of_states):
+        assert sorted(mdp.alpha_predecessors(s)) == sorted(expected.alpha_predecessors(s))
+        assert mdp.pred(s) == expected.pred(s)
+        assert mdp.number_of_predecessors(s) == expected.number_of_predecessors(s)
+
+
+def test_disable_compact_enable():
+    mdp = MDP([], [], [1, 1], 3)
+    mdp.enable_action(0, 0, [(1, 0.5), (2, 0.5)])
+    mdp.enable_action(0, 1, [(2, 1.)])
+    mdp.enable_action(1, 0, [(0, 1.)])
+    mdp.enable_action(2, 0, [(2, 1.)])
+    mdp.set_mutable()
+    mdp.predecessor_arrays()
+    mdp.disable_action(0, 0)
+    mdp.predecessor_arrays()
+    mdp.compact()
+    mdp.disable_action(0, 1)
+    mdp.enable_action(0, 1, [(1, 1.)])
+    assert_same_predecessors(mdp)
+    assert sorted(mdp.alpha_predecessors(1)) == [(0, 1)]
+    assert mdp.pred(2) == {2}
+
+
+def test_random_modifications():
+    random.seed(42)
+    for _ in range(20):
+        mdp = random_MDP(8, 4)
+        removed = []
+        mdp.set_mutable()
+        for _ in range(60):
+            operation = random.random()
+            if operation < 0.4:
+                s = random.randrange(mdp.number_of_states)
+                if mdp.number_of_enabled_actions(s):
+                    alpha = random.choice(mdp.act(s))
+                    removed.append((s, alpha, list(next(succ_list for (beta, succ_list) in mdp.alpha_successors(s)
+                                                        if beta == alpha))))
+                    mdp.disable_action(s, alpha)
+            elif operation < 0.7 and removed:
+                (s, alpha, succ_list) = removed.pop(random.randrange(len(removed)))
+                mdp.enable_action(s, alpha, succ_list)
+            elif operation < 0.8:
+                mdp.compact()
+            elif operation < 0.9:
+                mdp.predecessor_arrays()
+            else:
+                assert_same_predecessors(mdp)
+        assert_same_predecessors(mdp)
+        mdp.set_mutable(False)
+        assert_same_predecessors(mdp)
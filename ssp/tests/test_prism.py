@@ -0,0 +1,60 @@
+"""
+Tests of the import and of the export of the MDPs in the explicit formats of PRISM (@see io_utils.prism).
+"""
+import io
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import pytest
+from structures.mdp import MDP
+from io_utils.prism import import_from_prism, import_labels, export_to_prism
+from io_utils.yaml_parser import import_from_yaml
+
+
+def choices(mdp: MDP) -> list:
+    # the choices of each state, with the name and the weight of their actions
+    return [[(mdp.act_name(alpha), mdp.w(alpha), list(succ_list)) for (alpha, succ_list) in mdp.alpha_successors(s)]
+            for s in range(mdp.number_of_states)]
+
+
+def test_import():
+    tra = io.StringIO('3 4 6\n0 0 1 0.5 a\n0 0 2 0.5 a\n0 1 0 1 b\n1 0 1 1\n2 0 2 0.25 a\n2 0 0 0.75 a\n')
+    sta = io.StringIO('(x,y)\n0:(0,0)\n1:(0,1)\n2:(1,0)\n')
+    rew = io.StringIO('3 4 3\n0 0 2\n0 1 0 1\n2 0 0 4\n1 0 1 1\n')
+    mdp = import_from_prism(tra, sta, rew)
+    assert [mdp.state_name(s) for s in range(3)] == ['(0,0)', '(0,1)', '(1,0)']
+    # a is used with the rewards 2 and 3 (= 0.75 x 4), the unlabeled choice of 1 gets the action a0
+    assert choices(mdp) == [[('a|2', 2, [(1, .5), (2, .5)]), ('b', 1, [(0, 1.)])], [('a0', 1, [(1, 1.)])],
+                            [('a|3', 3, [(2, .25), (0, .75)])]]
+    lab = io.StringIO('0="init" 1="deadlock" 2="goal"\n0: 0\n2: 2\n1: 2\n')
+    assert import_labels(lab) == {'init': [0], 'deadlock': [], 'goal': [1, 2]}
+
+
+def test_rewards_errors():
+    tra = io.StringIO('1 1 1\n0 0 0 1\n')
+    with pytest.raises(ValueError):
+        import_from_prism(tra, rew=io.StringIO('1 1 1\n0 0 0.5\n'))
+
+
+def test_export(tmp_path):
+    with open(myPath + '/../examples/mdp2.yaml', 'r') as stream:
+        mdp = import_from_yaml(stream)
+    file_name = str(tmp_path / 'mdp2')
+    export_to_prism(mdp, file_name, labels={'goal': [1], 'start': [0, 1]})
+    with open(file_name + '.tra') as tra, open(file_name + '.sta') as sta, open(file_name + '.trew') as rew:
+        imported = import_from_prism(tra, sta, rew)
+    assert choices(imported) == choices(mdp)
+    with open(file_name + '.lab') as lab:
+        assert import_labels(lab) == {'goal': [1], 'start': [0, 1]}
+    # the states are not valuations : they are written as the valuations of a single variable
+    assert [imported.state_name(s) for s in range(imported.number_of_states)] == \
+           ['(%d)' % s for s in range(mdp.number_of_states)]
+    # the valuations are kept
+    export_to_prism(imported, file_name)
+    with open(file_name + '.tra') as tra, open(file_name + '.sta') as sta, open(file_name + '.trew') as rew:
+        assert choices(import_from_prism(tra, sta, rew)) == choices(mdp)
+    with open(file_name + '.sta') as sta:
+        assert sta.read().splitlines()[1:] == ['%d:(%d)' % (s, s) for s in range(mdp.number_of_states)]
@@ -0,0 +1,123 @@
+"""
+Tests of the reachability solvers : the states from which T is reached with probability 1 (@see
+solvers.reachability.pr_max_1), and the backends of reach, checked against the linear program solved with HiGHS.
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+from structures.mdp import MDP, SubMDP
+from structures.generator import random_MDP
+from solvers.reachability import pr_max_1, reach, build_strategy
+
+
+def pr_max_1_by_definition(mdp: MDP, T: list) -> list:
+    # greatest set of states R such that every state of R reaches T through actions whose successors are in R
+    R = set(range(mdp.number_of_states))
+    while True:
+        enabled = {s: [succ_list for (_, succ_list) in mdp.alpha_successors(s)
+                       if all(succ in R for (succ, _) in succ_list)] for s in R}
+        reached = set(T)
+        changed = True
+        while changed:
+            changed = False
+            for s in R - reached:
+                if any(succ in reached for succ_list in enabled[s] for (succ, _) in succ_list):
+                    reached.add(s)
+                    changed = True
+        if reached >= R:
+            return sorted(R)
+        R &= reached
+
+
+def test_random_mdps():
+    random.seed(7)
+    for _ in range(500):
+        n = random.randint(2, 20)
+        mdp = MDP([], [], [1, 1, 1], n)
+        for s in range(n):
+            for alpha in random.sample(range(3), random.randint(1, 3)):
+                successors = random.sample(range(n), random.randint(1, 2))
+                mdp.enable_action(s, alpha, [(succ, 1. / len(successors)) for succ in successors])
+        T = random.sample(range(n), random.randint(1, 2))
+        assert pr_max_1(mdp, T) == pr_max_1_by_definition(mdp, T)
+
+
+def test_chain_of_removed_states():
+    # each state i of the chain reaches T with probability 1/2 by its action 0, or else the state i - 1, and the state 0
+    # falls into a sink : T is not reached surely from any state of the chain, one of them being found per round
+    n = 3000
+    mdp = MDP([], [], [1, 1], n + 2)
+    T, sink = n, n + 1
+    mdp.enable_action(0, 0, [(T, .5), (sink, .5)])
+    mdp.enable_action(0, 1, [(0, 1.)])
+    for s in range(1, n):
+        mdp.enable_action(s, 0, [(T, .5), (s - 1, .5)])
+        mdp.enable_action(s, 1, [(s, 1.)])
+    mdp.enable_action(T, 0, [(T, 1.)])
+    mdp.enable_action(sink, 0, [(sink, 1.)])
+    assert pr_max_1(mdp, [T]) == [T]
+
+
+def assert_same_probabilities(x, y):
+    assert max(abs(x_s - y_s) for (x_s, y_s) in zip(x, y)) < 1e-6
+
+
+def test_topological():
+    random.seed(10)
+    for n in (10, 40):
+        for _ in range(20):
+            mdp = random_MDP(n, 3, force_weakly_connected_to=True)
+            T = random.sample(range(n), 2)
+            expected = reach(mdp, T, solver='highs')
+            assert_same_probabilities(reach(mdp, T, method='topological', epsilon=1e-12), expected)
+            assert_same_probabilities(reach(mdp, T, method='topological', epsilon=1e-12, relative=True), expected)
+
+
+def test_value_iteration():
+    random.seed(2)
+    for n in (10, 40):
+        for _ in range(20):
+            mdp = random_MDP(n, 3, force_weakly_connected_to=True)
+            T = random.sample(range(n), 2)
+            expected = reach(mdp, T, solver='highs')
+            assert_same_probabilities(reach(mdp, T, method='vi', epsilon=1e-12), expected)
+            assert_same_probabilities(reach(mdp, T, method='vi', epsilon=1e-12, relative=True), expected)
+
+
+def strategy_probabilities(mdp: MDP, T: list, strategy) -> list:
+    # reachability probabilities to T of the Markov chain induced by the strategy
+    return reach(SubMDP(mdp, enabled=lambda s, alpha: strategy(s) == alpha), T, solver='highs')
+
+
+def test_end_component_strategy():
+    # the states 0 and 1 form an end component : α loops between them, β leaves 0 with 1/2 and γ leaves 1 with 3/5,
+    # so that both states have the value 3/5 and an optimal strategy must leave the end component through γ
+    mdp = MDP([], [], [1, 1, 1], 4)
+    mdp.enable_action(0, 0, [(1, 1.)])
+    mdp.enable_action(0, 1, [(2, .5), (3, .5)])
+    mdp.enable_action(1, 0, [(0, 1.)])
+    mdp.enable_action(1, 2, [(2, .6), (3, .4)])
+    mdp.enable_action(2, 0, [(2, 1.)])
+    mdp.enable_action(3, 0, [(3, 1.)])
+    for method in ('vi', 'topological'):
+        assert_same_probabilities(reach(mdp, [2], method=method, epsilon=1e-12), [.6, .6, 1., 0.])
+        strategy = build_strategy(mdp, [2], method=method, epsilon=1e-12)
+        assert strategy(1) == 2
+        assert_same_probabilities(strategy_probabilities(mdp, [2], strategy), [.6, .6, 1., 0.])
+
+
+def test_strategies():
+    random.seed(12)
+    for n in (10, 40):
+        for _ in range(20):
+            mdp = random_MDP(n, 3, force_weakly_connected_to=True)
+            T = random.sample(range(n), 2)
+            expected = reach(mdp, T, solver='highs')
+            for (method, solver) in (('lp', 'highs'), ('vi', None), ('topological', None)):
+                strategy = build_strategy(mdp, T, method=method, epsilon=1e-12) if solver is None \
+                    else build_strategy(mdp, T, solver=solver)
+                assert_same_probabilities(strategy_probabilities(mdp, T, strategy), expected)
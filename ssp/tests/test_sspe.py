@@ -0,0 +1,44 @@
+"""
+Tests of the backends of the minimum expected cost solver (@see solvers.sspe.min_expected_cost), checked against the
+linear program solved with HiGHS.
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+from structures.mdp import SubMDP
+from structures.generator import random_MDP
+from solvers.sspe import min_expected_cost, policy_iteration
+
+
+def assert_same_costs(x, y):
+    assert [x_s == float('inf') for x_s in x] == [y_s == float('inf') for y_s in y]
+    assert max((abs(x_s - y_s) / max(1., y_s) for (x_s, y_s) in zip(x, y) if y_s != float('inf')), default=0.) < 1e-6
+
+
+def test_topological():
+    random.seed(20)
+    for n in (10, 40):
+        for _ in range(20):
+            mdp = random_MDP(n, 3, weights_interval=(1, 5), force_weakly_connected_to=True)
+            T = random.sample(range(n), 2)
+            assert_same_costs(min_expected_cost(mdp, T, method='topological', epsilon=1e-12),
+                              min_expected_cost(mdp, T, solver='highs'))
+
+
+def test_policy_iteration():
+    random.seed(3)
+    for n in (10, 40):
+        for _ in range(20):
+            mdp = random_MDP(n, 3, weights_interval=(1, 5), force_weakly_connected_to=True)
+            T = random.sample(range(n), 2)
+            expected = min_expected_cost(mdp, T, solver='highs')
+            assert_same_costs(min_expected_cost(mdp, T, method='pi'), expected)
+            # the strategy of the policy iteration achieves the minimum expected costs
+            x, strategy = policy_iteration(mdp, T)
+            assert_same_costs(x, expected)
+            assert_same_costs(min_expected_cost(SubMDP(mdp, enabled=lambda s, alpha: strategy[s] == alpha), T,
+                                                solver='highs'), expected)
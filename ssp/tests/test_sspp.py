@@ -0,0 +1,101 @@
+"""
+Tests of the cache of the solutions of the SSPP problem (@see solvers.sspp.solve_short_paths_from).
+"""
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import random
+from structures.mdp import MDP
+from structures.generator import random_MDP
+from solvers.sspp import solve_short_paths_from, quantile, short_paths_table, force_short_paths, \
+    short_paths_probability
+
+
+def two_ways_mdp() -> MDP:
+    # from the state 0, the action 0 reaches the target 1 surely and the action 1 only with probability 1/2
+    mdp = MDP([], [], [1, 1], 3)
+    mdp.enable_action(0, 0, [(1, 1.)])
+    mdp.enable_action(0, 1, [(1, .5), (2, .5)])
+    mdp.enable_action(1, 0, [(1, 1.)])
+    mdp.enable_action(2, 0, [(2, 1.)])
+    return mdp
+
+
+def test_solution_after_modification():
+    for method in ('lp', 'dp'):
+        mdp = two_ways_mdp()
+        assert abs(solve_short_paths_from(mdp, 0, [1], 3, solver='highs', method=method).probability - 1.) < 1e-9
+        mdp.disable_action(0, 0)
+        assert abs(solve_short_paths_from(mdp, 0, [1], 3, solver='highs', method=method).probability - .5) < 1e-9
+
+
+def test_solution_after_compaction():
+    mdp = two_ways_mdp()
+    mdp.set_mutable()
+    solution = solve_short_paths_from(mdp, 0, [1], 3, method='dp')
+    assert solve_short_paths_from(mdp, 0, [1], 3, method='dp') is solution
+    mdp.disable_action(0, 0)
+    mdp.compact()
+    assert abs(solve_short_paths_from(mdp, 0, [1], 3, method='dp').probability - .5) < 1e-9
+
+
+def test_solution_per_solver():
+    mdp = two_ways_mdp()
+    solution = solve_short_paths_from(mdp, 0, [1], 3, solver='highs')
+    assert solve_short_paths_from(mdp, 0, [1], 3, solver='highs') is solution
+    assert solve_short_paths_from(mdp, 0, [1], 3, solver='highs', method='dp') is not solution
+
+
+def geometric_mdp() -> MDP:
+    # from the state 0, the target 1 is reached with probability 1/2 at each step
+    mdp = MDP([], [], [1], 2)
+    mdp.enable_action(0, 0, [(0, .5), (1, .5)])
+    mdp.enable_action(1, 0, [(1, 1.)])
+    return mdp
+
+
+def test_quantile():
+    mdp = geometric_mdp()
+    assert quantile(mdp, 0, [1], .75)[0] == 2
+    assert quantile(mdp, 0, [1], 1. - 2. ** -30)[0] == 30
+    assert quantile(mdp, 0, [1], 1.) == (None, None)
+    assert quantile(mdp, 0, [1], 1., l_max=100) == (None, None)
+    assert quantile(mdp, 0, [1], .99, l_max=5) == (None, None)
+    assert quantile(two_ways_mdp(), 0, [1], 1.)[0] == 1
+
+
+def test_force_short_paths():
+    random.seed(5)
+    for _ in range(20):
+        mdp = random_MDP(8, 3, weights_interval=(1, 3), force_weakly_connected_to=True)
+        T = [0]
+        table = short_paths_table(mdp, T, 6)
+        for l in (0, 3, 6):
+            for b in (.2, .5, 1.):
+                assert force_short_paths(mdp, T, l, b) == (table[l] >= b).tolist()
+
+
+def test_short_paths_probability():
+    random.seed(6)
+    for _ in range(20):
+        mdp = random_MDP(8, 3, weights_interval=(1, 3), force_weakly_connected_to=True)
+        x, strategy = short_paths_probability(mdp, [0], 6)
+        assert x == short_paths_table(mdp, [0], 6)[6].tolist()
+        assert short_paths_probability(mdp, [0], 6, with_strategy=False) == (x, None)
+        # the probabilities of the strategy are the maximum ones
+        for s in range(1, mdp.number_of_states):
+            assert abs(strategy_probability(mdp, strategy, s, 0, 6, [0]) - x[s]) < 1e-9
+
+
+def strategy_probability(mdp: MDP, strategy, s: int, v: int, l: int, T: list) -> float:
+    # probability to reach T from s with a path length <= l, following the counter-based strategy
+    if s in T:
+        return 1.
+    alpha = strategy(s, v)
+    if alpha is None or v + mdp.w(alpha) > l:
+        return 0.
+    successors = next(succ_list for (beta, succ_list) in mdp.alpha_successors(s) if beta == alpha)
+    return sum(pr * strategy_probability(mdp, strategy, succ, v + mdp.w(alpha), l, T) for (succ, pr) in successors)
@@ -0,0 +1,125 @@
+"""
+Tests of the import and of the export of the MDPs in yaml (@see io_utils.yaml_parser), the streaming import being
+checked against the yaml document tree.
+"""
+import gzip
+import io
+import os
+import sys
+
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../')
+
+import pytest
+import yaml
+from structures.mdp import MDP
+from io_utils.yaml_parser import import_from_yaml, export_to_yaml, write_yaml, str_to_float
+from io_utils.json_lines import import_from_jsonl, export_to_jsonl
+
+examples = [myPath + '/../examples/' + name for name in ('simple_mdp.yaml', 'mdp2.yaml', 'mdp3.yaml',
+                                                           'agent_stochastic_maze.yaml')]
+
+
+def described(mdp: MDP) -> tuple:
+    # the MDP described by the names of its states and actions
+    return ([mdp.state_name(s) for s in range(mdp.number_of_states)],
+            {mdp.act_name(alpha): mdp.w(alpha) for alpha in range(mdp.number_of_actions)},
+            [[(mdp.act_name(alpha), [(mdp.state_name(succ), pr) for (succ, pr) in succ_list])
+              for (alpha, succ_list) in mdp.alpha_successors(s)] for s in range(mdp.number_of_states)])
+
+
+def described_by_tree(document: dict) -> tuple:
+    # the MDP described by the yaml document tree
+    mdp = document['mdp']
+    return ([str(state['name']) for state in mdp['states']],
+            {str(action['name']): int(action['weight']) for action in mdp['actions']},
+            [[(str(enabled_action['name']), [(str(transition['target']), str_to_float(str(transition['probability'])))
+                                             for transition in enabled_action['transitions']])
+              for enabled_action in state.get('enabled actions') or []] for state in mdp['states']])
+
+
+def test_examples():
+    for example in examples:
+        with open(example, 'r') as stream:
+            mdp = import_from_yaml(stream)
+        with open(example, 'r') as stream:
+            assert described(mdp) == described_by_tree(yaml.safe_load(stream))
+
+
+def test_syntax():
+    # the actions are declared after their use, the keys are in any order and the unknown keys are ignored
+    mdp = import_from_yaml(io.StringIO('''
+comment: an MDP
+mdp:
+  actions:
+    - {weight: 2, name: a}
+  states:
+    - enabled actions:
+        - transitions:
+            - {probability: 1/4, target: 1}
+            - {target: '0', probability: 0.75}
+          name: a
+      name: 0
+      color: red
+    - name: 1
+      enabled actions: []
+'''))
+    assert described(mdp) == (['0', '1'], {'a': 2}, [[('a', [('1', .25), ('0', .75)])], []])
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        import_from_yaml(io.StringIO('- mdp'))
+    with pytest.raises(ValueError) as error:
+        import_from_yaml(io.StringIO('''
+mdp:
+  states:
+    - name: s
+      enabled actions:
+        - name: a
+          transitions:
+            - {target: t, probability: 1}
+  actions:
+    - {name: a, weight: 1}
+'''))
+    assert 't' in str(error.value)
+
+
+def imported(example: str) -> MDP:
+    with open(example, 'r') as stream:
+        return import_from_yaml(stream)
+
+
+def tricky_mdp() -> MDP:
+    # names that are not plain yaml scalars, and probabilities that are not written with a dot
+    mdp = MDP(['s', 'yes', '1', 'a: b', '- c', 'ü "d"', '(0, 1)'], ['α', 'null', '2.5'], [1, 2, 3])
+    mdp.enable_action(0, 0, [(1, 1e-05), (2, 1 - 1e-05)])
+    mdp.enable_action(0, 1, [(3, 1 / 3), (4, 2 / 3)])
+    mdp.enable_action(1, 2, [(5, 1.)])
+    mdp.enable_action(2, 0, [(6, 1.)])
+    mdp.enable_action(6, 2, [(0, .5), (6, .5)])
+    return mdp
+
+
+def test_export(tmp_path):
+    for mdp in [tricky_mdp()] + [imported(example) for example in examples]:
+        stream = io.StringIO()
+        write_yaml(mdp, stream)
+        assert described(import_from_yaml(io.StringIO(stream.getvalue()))) == described(mdp)
+        assert described_by_tree(yaml.safe_load(stream.getvalue())) == described(mdp)
+        export_to_yaml(mdp, str(tmp_path / 'mdp'))
+        with open(str(tmp_path / 'mdp.yaml'), 'r') as yaml_file:
+            assert described(import_from_yaml(yaml_file)) == described(mdp)
+        export_to_yaml(mdp, str(tmp_path / 'mdp'), compress=True)
+        with gzip.open(str(tmp_path / 'mdp.yaml.gz'), 'rt') as yaml_file:
+            assert described(import_from_yaml(yaml_file)) == described(mdp)
+
+
+def test_json_lines(tmp_path):
+    for mdp in [tricky_mdp()] + [imported(example) for example in examples]:
+        export_to_jsonl(mdp, str(tmp_path / 'mdp'))
+        with open(str(tmp_path / 'mdp.jsonl'), 'r') as jsonl_file:
+            assert described(import_from_jsonl(jsonl_file)) == described(mdp)
+        export_to_jsonl(mdp, str(tmp_path / 'mdp'), compress=True)
+        with gzip.open(str(tmp_path / 'mdp.jsonl.gz'), 'rt') as jsonl_file:
+            assert described(import_from_jsonl(jsonl_file)) == described(mdp)